@@ -4,10 +4,16 @@ PDF Text Recognizer - Modern GUI Application
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
+import atexit
+import bisect
+import collections
+import functools
 import os
 import sys
 import threading
+import time
 import traceback
+import numpy as np
 from PIL import Image, ImageTk
 import pdfplumber
 import re
@@ -15,6 +21,13 @@ import csv
 from typing import Tuple, Optional
 from scripts.Pdf_to_text import AcademicPDFRecognizer
 
+# One scan with this precompiled pattern indexes every citation marker in the
+# document; group order encodes the match preference used by
+# _find_citation_in_text: bracketed first, then a bare number, then
+# parenthesized. No per-ref patterns are ever built — lookups after the scan
+# are dict hits.
+_CITATION_SCAN_RE = re.compile(r'\[(\d+)\]|\((\d+)\)|\b(\d+)\b')
+
 
 class PDFTextRecognizerApp:
     def __init__(self, root):
@@ -147,43 +160,81 @@ class PDFTextRecognizerApp:
         self._job_id = 0  # monotonic counter; stale after() callbacks are discarded
         self._no_spanmap_warned = False  # avoid spamming log/status on clicks before extraction
         
-        # Minimal file log (no console needed)
+        # Minimal file log (no console needed). One line-buffered handle held
+        # open for the app lifetime; per-line open/close is a syscall pair each
         try:
             self._log_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.log")
         except Exception:
             self._log_path = "app.log"
-        
-        # Cached pdfplumber handle (avoid re-opening per render)
-        self._pdf_handle = None
+        try:
+            self._log_fh = open(self._log_path, "a", encoding="utf-8", buffering=1)
+            atexit.register(self._log_fh.close)
+        except Exception:
+            self._log_fh = None
+        self._log_lock = threading.Lock()  # _log may be hit from worker threads
+        
+        # Small LRU of open pdfplumber handles keyed on path (avoid re-parsing
+        # the xref table when the user toggles between recent files)
+        self._handle_cache = collections.OrderedDict()
+        self._HANDLE_CACHE_SIZE = 3
+        self._handle_lock = threading.Lock()  # guards _handle_cache mutation
+        # pdfplumber/pdfminer page objects are not thread-safe: all
+        # rasterization (render worker + prefetch threads) and handle
+        # closing serialize on this. RLock because a render can evict —
+        # and close — a handle while already holding it.
+        self._render_lock = threading.RLock()
+        self._FONT_TREE_TOP_K = 500  # rows inserted synchronously on refresh
         
         # Navigation
         self.match_items = []
+        self._bib_detail_report_rows = []  # prebuilt section-4 rows for export
         self.current_match_index = -1
         
-        # PDF Viewer State (LRU cache: keep max _IMG_CACHE_SIZE pages)
-        self.pdf_images = {}
-        self._img_lru = []  # page_num order, most recent at end
-        self._IMG_CACHE_SIZE = 8
+        # PDF Viewer State (LRU cache of rendered PIL images, keyed (page, zoom))
+        self._IMG_CACHE_SIZE = 24  # several zooms per page survive the LRU
+        self._render_cached = functools.lru_cache(maxsize=self._IMG_CACHE_SIZE)(self._render_page_image)
+        self._photo_cache = collections.OrderedDict()  # (page, zoom) -> PhotoImage
+        self._photo = None  # PhotoImage currently on canvas (must stay referenced)
+        self._photo_im = None  # PIL image backing _photo (for cheap zoom previews)
+        self._photo_zoom = None  # zoom the current _photo was rendered at
+        self._zoom_render_after = None  # pending after() id for deferred re-render
+        self._render_job = 0  # monotonic counter; stale background renders are dropped
+        self._canvas_image_id = None  # reused canvas image item; created on first paint
+        self._canvas_scroll_size = None  # (w, h) the scrollregion was last set for
+        self._pending_highlight = None  # (page, bbox) drawn once that page is painted
         self.current_page = 1
         self.total_pages = 0
         # self.pdf_zoom already set above (screen_scale aware)
-        self.supersample = 2.0
-        
+
         # Drag State (Panning)
         self._drag_data = {"x": 0, "y": 0, "moved": False}
         
         # Mappings & Stats
-        self.page_mapping = {}
-        self.span_mapping = {}
+        # line -> page as sorted breakpoints: page i starts at _page_break_lines[i]
+        self._page_break_lines = []
+        self._page_break_pages = []
+        self.span_mapping = collections.defaultdict(list)
+        self.span_arrays = {}  # page -> SoA bbox arrays for vectorized hit-tests
+        self._ref_positions = None  # ref id -> (offset, length, prio); built lazily
+        self._line_starts = np.zeros(1, dtype=np.int64)
+        # Sorted span-start keys (line*10M+col) for O(log n) click resolution
+        self._span_start_keys = []
+        self._span_lookup = []  # parallel: (end_key, page, font_span dict)
+        self._span_key_arr = None  # int64 copies of the keys for searchsorted
+        self._span_end_arr = None
+        self._span_page_arr = None
         self.font_spans = []
-        self.font_stats = {} # (name, size) -> count
-        self.tree_items = [] # Cache for filtering
+        self.font_stats = collections.Counter() # (name, size) -> count
+        # Filter cache as parallel columns: _filter_fonts touches only the
+        # id/font/size columns, so no per-row tuple unpacking on keystrokes
+        self._ti_ids = []
+        self._ti_fonts = []
+        self._ti_size_strs = []  # str(size) precomputed once per refresh
         
         # Settings
         self.font_family_var = tk.StringVar(value="Times New Roman")
         self.font_size_var = tk.StringVar(value="12")
-        # Render quality: fixed supersample (set in self.supersample)
-        
+
         self._create_ui()
         self._create_context_menu()
     
@@ -239,6 +290,8 @@ class PDFTextRecognizerApp:
         self.var_auto_analyze = tk.BooleanVar(value=True)
         self.cv_switch = tk.Canvas(switch_frame, width=44, height=24, bg=self.bg_card, highlightthickness=0)
         self.cv_switch.pack(side=tk.RIGHT)
+        self._sw_bg = None    # canvas item ids, created on first draw
+        self._sw_thumb = None
         self._draw_toggle_switch()
         self.cv_switch.bind("<Button-1>", self._toggle_analyze_switch)
         
@@ -484,13 +537,20 @@ class PDFTextRecognizerApp:
 
 
     def _close_pdf_handle(self):
-        """Close the cached pdfplumber handle."""
-        if self._pdf_handle is not None:
+        """Close all cached pdfplumber handles."""
+        with self._handle_lock:
+            handles = list(self._handle_cache.values())
+            self._handle_cache.clear()
+        for handle in handles:
+            self._close_handle(handle)
+
+    def _close_handle(self, handle):
+        """Close a pdfplumber handle, never while a render is using it."""
+        with self._render_lock:
             try:
-                self._pdf_handle.close()
+                handle.close()
             except Exception:
                 pass
-            self._pdf_handle = None
 
     def _report_bg_error(self, kind: str, error: Exception, tb_str: str):
         """Unified background error reporting (main thread only)."""
@@ -514,17 +574,31 @@ class PDFTextRecognizerApp:
         threading.Thread(target=worker, daemon=True).start()
 
     def _get_pdf_handle(self):
-        """Get (or open) the cached pdfplumber handle."""
-        if self._pdf_handle is None and self.recognizer:
-            self._pdf_handle = pdfplumber.open(self.recognizer.pdf_path)
-        return self._pdf_handle
+        """Get (or open) a cached pdfplumber handle for the current file."""
+        if not self.recognizer:
+            return None
+        path = self.recognizer.pdf_path
+        evicted = None
+        with self._handle_lock:
+            if path in self._handle_cache:
+                self._handle_cache.move_to_end(path)
+            else:
+                self._handle_cache[path] = pdfplumber.open(path)
+                if len(self._handle_cache) > self._HANDLE_CACHE_SIZE:
+                    _, evicted = self._handle_cache.popitem(last=False)
+            handle = self._handle_cache[path]
+        if evicted is not None:
+            self._close_handle(evicted)
+        return handle
 
     def _log(self, msg: str):
         """Append one timestamped line to app.log (no console needed)."""
         import datetime
+        if self._log_fh is None:
+            return
         try:
-            with open(self._log_path, "a", encoding="utf-8") as f:
-                f.write(f"{datetime.datetime.now():%Y-%m-%d %H:%M:%S}  {msg}\n")
+            with self._log_lock:
+                self._log_fh.write(f"{datetime.datetime.now():%Y-%m-%d %H:%M:%S}  {msg}\n")
         except Exception:
             pass
 
@@ -537,16 +611,14 @@ class PDFTextRecognizerApp:
             # Invalidate any in-flight after() callbacks from previous file
             self._job_id += 1
             self._no_spanmap_warned = False
-            
-            # Close previous handle if switching files
-            self._close_pdf_handle()
-            
+
+            # Previous handles stay in the LRU so switching back is free
             try:
                 self.recognizer = AcademicPDFRecognizer(path)
                 self.lbl_file_status.config(text=os.path.basename(path))
-                self.pdf_images = {}
-                self._img_lru.clear()
-                
+                self._render_cached.cache_clear()
+                self._photo_cache.clear()
+
                 pdf = self._get_pdf_handle()
                 self.total_pages = len(pdf.pages)
                 self._log(f"OPEN path={path} pages={self.total_pages}")
@@ -554,7 +626,11 @@ class PDFTextRecognizerApp:
                 self.btn_extract_plain.config(state=tk.NORMAL)
                 self.btn_extract_fonts.config(state=tk.NORMAL)
             except Exception as e:
-                self._close_pdf_handle()
+                # Drop only the handle for the file that failed to open
+                with self._handle_lock:
+                    broken = self._handle_cache.pop(path, None)
+                if broken is not None:
+                    self._close_handle(broken)
                 self.status_var.set(f"Failed to open PDF: {e}")
                 self._log(f"OPEN_FAIL path={path} err={e}")
 
@@ -587,9 +663,35 @@ class PDFTextRecognizerApp:
                 x = self.canvas_pdf.canvasx(event.x)
                 y = self.canvas_pdf.canvasy(event.y)
             except: pass
-            self._update_zoom()
+            self._preview_zoom()
         return "break" # Prevent default
 
+    def _preview_zoom(self):
+        """
+        Cheap zoom preview while the wheel is spinning: rescale the PIL image
+        already on canvas (NEAREST) instead of re-rastering via pdfplumber on
+        every tick. A high-quality render is scheduled once ticks stop.
+        """
+        self.combo_zoom.set(f"{int(self.pdf_zoom * 100)}%")
+        if self._photo_im is not None and self._photo_zoom:
+            try:
+                ratio = self.pdf_zoom / self._photo_zoom
+                w = max(1, int(self._photo_im.width * ratio))
+                h = max(1, int(self._photo_im.height * ratio))
+                preview = self._photo_im.resize((w, h), Image.Resampling.NEAREST)
+                self._photo = self._make_photo(preview)
+                self._set_canvas_image(self._photo, w, h)
+            except Exception:
+                pass
+        # Debounce the true render: cancel pending, schedule a fresh one
+        if self._zoom_render_after is not None:
+            self.root.after_cancel(self._zoom_render_after)
+        self._zoom_render_after = self.root.after(120, self._finish_zoom)
+
+    def _finish_zoom(self):
+        self._zoom_render_after = None
+        self._update_zoom()
+
     # Removed _on_wheel_zoom to avoid confusion
 
     def _copy_selection(self):
@@ -633,25 +735,40 @@ class PDFTextRecognizerApp:
             pdf_y = canvas_y / self.pdf_zoom
             
             page_spans = self.span_mapping.get(self.current_page, [])
-            found = False
+            arr = self.span_arrays.get(self.current_page)
             self.txt_output.tag_remove("pdf_selection", "1.0", tk.END)
-            for span_data in page_spans:
-                x0, top, x1, bottom = span_data["bbox"]
-                if x0 <= pdf_x <= x1 and top <= pdf_y <= bottom:
-                    start = span_data["start"]
-                    end = span_data["end"]
-                    self.txt_output.tag_add("pdf_selection", start, end)
-                    self.txt_output.see(start)
-                    found = True
-                    break
-            if found: 
+            found = False
+            if arr is not None:
+                # Margin clicks reject against the page's outer text bbox
+                # before any per-span work
+                bx0, btop, bx1, bbot = arr['bounds']
+                if not (bx0 <= pdf_x <= bx1 and btop <= pdf_y <= bbot):
+                    self.status_var.set("Outside text area")
+                    return
+                # Narrow to the text band that can contain the click, then
+                # run the vectorized compares on that slice only
+                lo = int(np.searchsorted(arr['top_sorted'], pdf_y - arr['max_h'], side='left'))
+                hi = int(np.searchsorted(arr['top_sorted'], pdf_y, side='right'))
+                cand = arr['order'][lo:hi]
+                if len(cand):
+                    mask = ((arr['x0'][cand] <= pdf_x) & (pdf_x <= arr['x1'][cand]) &
+                            (arr['top'][cand] <= pdf_y) & (pdf_y <= arr['bottom'][cand]))
+                    k = int(np.argmax(mask))
+                    found = bool(mask[k])
+                if found:
+                    span_data = page_spans[int(cand[k])]
+                    self.txt_output.tag_add("pdf_selection", span_data["start"], span_data["end"])
+                    self.txt_output.see(span_data["start"])
+            if found:
                 self.status_var.set("Match found")
-            elif page_spans:
-                # Log nearest span for debugging coordinate alignment
-                nearest = min(page_spans, key=lambda s: (
-                    max(s["bbox"][0] - pdf_x, 0, pdf_x - s["bbox"][2]) ** 2 +
-                    max(s["bbox"][1] - pdf_y, 0, pdf_y - s["bbox"][3]) ** 2))
-                nb = nearest["bbox"]
+            elif arr is not None and len(page_spans):
+                # Log nearest span for debugging coordinate alignment.
+                # Exact point-to-rectangle distance over the SoA arrays; one
+                # vectorized pass beats a KD-tree for per-page span counts
+                # and needs no extra index
+                dx = np.clip(pdf_x, arr['x0'], arr['x1']) - pdf_x
+                dy = np.clip(pdf_y, arr['top'], arr['bottom']) - pdf_y
+                nb = page_spans[int(np.argmin(dx * dx + dy * dy))]["bbox"]
                 self._log(f"CLICK_MISS page={self.current_page} "
                           f"pdf=({pdf_x:.1f},{pdf_y:.1f}) "
                           f"nearest_bbox=({nb[0]:.1f},{nb[1]:.1f},{nb[2]:.1f},{nb[3]:.1f})")
@@ -681,48 +798,157 @@ class PDFTextRecognizerApp:
 
     def _update_zoom(self):
         self.combo_zoom.set(f"{int(self.pdf_zoom * 100)}%")
-        self.pdf_images = {}
-        self._img_lru.clear()
-        self.canvas_pdf.delete("all")
         self._show_pdf_page(self.current_page)
 
+    def _render_page_image(self, page_num, zoom_key):
+        """Rasterize one page at the given zoom. Called through the LRU wrapper."""
+        # Serialized: the render worker and prefetch threads share one
+        # pdfplumber handle, whose page objects are not thread-safe
+        with self._render_lock:
+            pdf = self._get_pdf_handle()
+            if pdf is None: return None
+            page = pdf.pages[page_num - 1]
+
+            # Single raster pass at device pixels (pdf_zoom already folds in
+            # screen_scale). The rasterizer antialiases at render resolution, so
+            # a supersample-then-downscale stage would just duplicate its work.
+            return page.to_image(resolution=72 * zoom_key).original
+
     def _show_pdf_page(self, page_num):
         if not self.recognizer or page_num < 1 or page_num > self.total_pages: return
+        # Navigating to a different page drops any stale citation highlight
+        if self._pending_highlight and self._pending_highlight[0] != page_num:
+            self._pending_highlight = None
+        key = (page_num, round(self.pdf_zoom, 2))
+        self._render_job += 1
+        my_job = self._render_job
+
+        # Cache hit: the PhotoImage exists, so the PIL render is a cached
+        # lookup too — display synchronously with no raster work
+        if key in self._photo_cache:
+            try:
+                self._display_page(key, self._render_cached(*key))
+            except Exception as e:
+                self.status_var.set(f"Page render error: {e}")
+            return
+
+        # Miss: rasterize on a worker thread; Tk only wraps the finished
+        # pixels. The job counter drops stale results if the user moves on.
+        def compute():
+            return self._render_cached(*key)
+
+        def done(im, error, tb_str="", job_id=None):
+            if job_id != self._render_job:
+                return  # superseded by a newer page/zoom request
+            if error:
+                self.status_var.set(f"Page render error: {error}")
+                self._log(f"RENDER_FAIL page={page_num} err={error}\n{tb_str or ''}")
+                return
+            if im is not None:
+                self._display_page(key, im)
+
+        self._start_bg_task("RENDER", my_job, compute, done)
+
+    def _display_page(self, key, im):
+        """Wrap a rendered PIL image for Tk and paint it (main thread only)."""
+        page_num = key[0]
+        # PhotoImage construction copies pixels, so cache it per (page, zoom)
+        # alongside the PIL image; the cache also keeps the Tk-side reference
+        # alive
+        photo = self._photo_cache.get(key)
+        if photo is None:
+            photo = self._make_photo(im)
+            self._photo_cache[key] = photo
+            if len(self._photo_cache) > self._IMG_CACHE_SIZE:
+                self._photo_cache.popitem(last=False)
+        else:
+            self._photo_cache.move_to_end(key)
+        self._photo = photo
+        self._photo_im = im
+        self._photo_zoom = key[1]
+
+        self._set_canvas_image(photo, im.width, im.height)
+        self.current_page = page_num
+        self.lbl_page.config(text=f"Page {page_num}/{self.total_pages}")
+        self._draw_pending_highlight(page_num)
+
+    def _draw_pending_highlight(self, page_num):
+        """
+        Draw the stashed citation highlight once its page is painted.
+        Renders can complete asynchronously, so the rectangle is drawn
+        here — after _set_canvas_image — rather than at selection time.
+        """
+        pending = self._pending_highlight
+        if not pending or pending[0] != page_num:
+            return
+        self._pending_highlight = None
+        scale = self.pdf_zoom  # PDF points * zoom = display pixels
+        x0, top, x1, bottom = pending[1]
+        self.canvas_pdf.create_rectangle(
+            x0 * scale, top * scale, x1 * scale, bottom * scale,
+            outline="red", width=3, tags="ref_highlight")
+        self.status_var.set(f"Located on Page {page_num}")
+
+    @staticmethod
+    def _make_photo(im):
+        """
+        Build a Tk photo from a PIL image. Handing Tk a complete PPM buffer
+        skips ImageTk's row-by-row put loop, which is a measurable slice of
+        render time on large pages. Falls back to ImageTk if the fast path
+        fails.
+        """
         try:
-            if page_num not in self.pdf_images:
-                pdf = self._get_pdf_handle()
-                if pdf is None: return
-                page = pdf.pages[page_num - 1]
-                
-                total_scale = self.pdf_zoom * self.supersample
-                im_high = page.to_image(resolution=72 * total_scale).original
-                target_w = int(im_high.width / self.supersample)
-                target_h = int(im_high.height / self.supersample)
-                im = im_high.resize((target_w, target_h), Image.Resampling.LANCZOS)
-                self.pdf_images[page_num] = ImageTk.PhotoImage(im)
-            
-            # LRU: move to end, evict oldest if over limit
-            if page_num in self._img_lru:
-                self._img_lru.remove(page_num)
-            self._img_lru.append(page_num)
-            while len(self._img_lru) > self._IMG_CACHE_SIZE:
-                old = self._img_lru.pop(0)
-                self.pdf_images.pop(old, None)
-            
-            self.canvas_pdf.delete("all")
-            self.canvas_pdf.create_image(0, 0, image=self.pdf_images[page_num], anchor=tk.NW)
-            self.canvas_pdf.config(scrollregion=self.canvas_pdf.bbox(tk.ALL))
-            self.current_page = page_num
-            self.lbl_page.config(text=f"Page {page_num}/{self.total_pages}")
-        except Exception as e:
-            self.status_var.set(f"Page render error: {e}")
+            if im.mode != "RGB":
+                im = im.convert("RGB")
+            header = f"P6\n{im.width} {im.height}\n255\n".encode()
+            return tk.PhotoImage(data=header + im.tobytes(), format="PPM")
+        except Exception:
+            return ImageTk.PhotoImage(im)
 
-    def _prev_page(self): 
-        if self.current_page > 1: 
+    def _set_canvas_image(self, photo, width, height):
+        """
+        Swap the page image into the reused canvas item. itemconfigure on one
+        item replaces the old clear-everything-and-recreate per paint; only
+        overlay highlights are cleared, and the scrollregion is reconfigured
+        only when the displayed size actually changes.
+        """
+        self.canvas_pdf.delete("ref_highlight")
+        if self._canvas_image_id is None:
+            self._canvas_image_id = self.canvas_pdf.create_image(0, 0, image=photo, anchor=tk.NW)
+        else:
+            self.canvas_pdf.itemconfigure(self._canvas_image_id, image=photo)
+        if self._canvas_scroll_size != (width, height):
+            self._canvas_scroll_size = (width, height)
+            self.canvas_pdf.config(scrollregion=(0, 0, width, height))
+
+    def _prev_page(self):
+        if self.current_page > 1:
             self._show_pdf_page(self.current_page - 1)
-    def _next_page(self): 
-        if self.current_page < self.total_pages: 
+            self._schedule_prefetch()
+    def _next_page(self):
+        if self.current_page < self.total_pages:
             self._show_pdf_page(self.current_page + 1)
+            self._schedule_prefetch()
+
+    def _schedule_prefetch(self):
+        """Warm the render cache with the neighbor pages once the UI is idle."""
+        page = self.current_page
+        self.root.after(200, lambda: self._prefetch(page + 1))
+        self.root.after(300, lambda: self._prefetch(page - 1))
+
+    def _prefetch(self, page_num):
+        """Render a page into the LRU in the background without painting it."""
+        if not self.recognizer or page_num < 1 or page_num > self.total_pages:
+            return
+        key = (page_num, round(self.pdf_zoom, 2))
+        if key in self._photo_cache:
+            return  # already warm
+        def worker():
+            try:
+                self._render_cached(*key)
+            except Exception:
+                pass  # prefetch is best-effort; the real show reports errors
+        threading.Thread(target=worker, daemon=True).start()
             
     def _extract_text(self):
         if not self.recognizer: return
@@ -738,12 +964,20 @@ class PDFTextRecognizerApp:
         if "Off" in mode_str: color_arg = 'off'
             
         full_text = self.recognizer.extract_text(detect_headers_by_color=color_arg, remove_references=remove_refs)
-        
+
         self.txt_output.insert(1.0, full_text)
-        self.span_mapping = {}
-        self.page_mapping = {}
+        self.span_mapping = collections.defaultdict(list)
+        self.span_arrays = {}
+        self._ref_positions = None
+        self._span_start_keys = []
+        self._span_lookup = []
+        self._span_key_arr = None
+        self._span_end_arr = None
+        self._span_page_arr = None
+        self._page_break_lines = []
+        self._page_break_pages = []
         self.font_spans = []
-        self.font_stats = {}
+        self.font_stats = collections.Counter()
         
         # Auto-update rich color status
         if hasattr(self.recognizer, 'is_color_rich') and self.recognizer.is_color_rich:
@@ -789,10 +1023,18 @@ class PDFTextRecognizerApp:
         
         # Reset GUI & Maps (main thread)
         self.txt_output.delete(1.0, tk.END)
-        self.span_mapping = {}
-        self.page_mapping = {}
+        self.span_mapping = collections.defaultdict(list)
+        self.span_arrays = {}
+        self._ref_positions = None
+        self._span_start_keys = []
+        self._span_lookup = []
+        self._span_key_arr = None
+        self._span_end_arr = None
+        self._span_page_arr = None
+        self._page_break_lines = []
+        self._page_break_pages = []
         self.font_spans = []
-        self.font_stats = {}
+        self.font_stats = collections.Counter()
         self.match_items = []
         self.recognizer.text_spans = []
         self._no_spanmap_warned = False
@@ -808,16 +1050,49 @@ class PDFTextRecognizerApp:
             """Collect all page spans in background thread — no Tk widget access."""
             all_pages = []
             count = 0
+            last_ping = 0.0
             for page_num, spans in self.recognizer.iter_extract_text_with_fonts():
                 if my_job != self._job_id:
                     return None  # cancelled / superseded
                 all_pages.append((page_num, spans))
                 count += 1
-                self.root.after(0, lambda c=count: self.status_var.set(f"Extracting page {c}/{total}..."))
+                # Throttle status pings to ~10 Hz: an after() per page wakes
+                # the Tk main loop once per page and preempts the worker
+                now = time.monotonic()
+                if now - last_ping > 0.1:
+                    last_ping = now
+                    self.root.after(0, lambda c=count: self.status_var.set(f"Extracting page {c}/{total}..."))
             return all_pages
 
         self._start_bg_task("EXTRACT", my_job, compute, self._extract_done)
     
+    def page_of_line(self, line):
+        """Map a Text-widget line number to its PDF page via the breakpoints."""
+        i = bisect.bisect_right(self._page_break_lines, line) - 1
+        if i < 0:
+            return self._page_break_pages[0] if self._page_break_pages else 1
+        return self._page_break_pages[i]
+
+    def _build_span_arrays(self):
+        """Rebuild the per-page SoA bbox arrays used by the click hit-test."""
+        self.span_arrays = {}
+        for page, spans in self.span_mapping.items():
+            bboxes = np.array([s["bbox"] for s in spans], dtype=np.float64)
+            # Spatial index: span indices sorted by top edge. A click at y can
+            # only hit spans with top in [y - max_height, y], so searchsorted
+            # narrows the candidate set to one text band before the compares.
+            order = np.argsort(bboxes[:, 1])
+            self.span_arrays[page] = {
+                'x0': bboxes[:, 0], 'top': bboxes[:, 1],
+                'x1': bboxes[:, 2], 'bottom': bboxes[:, 3],
+                'order': order,
+                'top_sorted': bboxes[order, 1],
+                'max_h': float((bboxes[:, 3] - bboxes[:, 1]).max()),
+                # Outer bbox of all spans: O(1) reject for margin clicks
+                'bounds': (float(bboxes[:, 0].min()), float(bboxes[:, 1].min()),
+                           float(bboxes[:, 2].max()), float(bboxes[:, 3].max())),
+            }
+
     def _extract_done(self, all_pages, error, tb_str="", job_id=None):
         """Process extraction results on main thread."""
         # Discard stale callback (user switched file / re-triggered)
@@ -836,52 +1111,93 @@ class PDFTextRecognizerApp:
             # Cancelled/superseded. Nothing to do.
             return
         
-        # Insert all data into widgets (main thread only)
+        # First pass: build the full text in Python, tracking (line, col)
+        # positions arithmetically. Per-span insert + index(END) round-trips
+        # into Tk dominated extraction time on span-dense papers.
+        buf = []
+        line, col = 1, 0
+        records = []  # (span, start_idx, end_idx, start_line, end_line)
         for page_num, spans in all_pages:
             self.recognizer.text_spans.extend(spans)
-            
+
             for span in spans:
-                text_content = span.text.replace('\r', '')
+                # Span text is already \r-free (stripped by the recognizer)
+                text_content = span.text
                 if text_content == "":
                     continue
 
                 if text_content == "\n":
-                    self.txt_output.insert(tk.END, "\n")
+                    buf.append("\n")
+                    line += 1
+                    col = 0
                     continue
 
-                start_idx = self.txt_output.index(tk.END)
-                self.txt_output.insert(tk.END, text_content)
-                end_idx = self.txt_output.index(tk.END)
-
-                if span.page not in self.span_mapping:
-                    self.span_mapping[span.page] = []
-                self.span_mapping[span.page].append({
-                    "bbox": span.bbox,
-                    "start": start_idx,
-                    "end": end_idx
-                })
-
-                self.font_spans.append({
-                    "text": span.text,
-                    "font": span.font_name,
-                    "size": span.font_size,
-                    "is_bold": getattr(span, 'is_bold', False),
-                    "is_italic": getattr(span, 'is_italic', False),
-                    "start": start_idx,
-                    "end": end_idx
-                })
-
-                s_line = int(start_idx.split('.')[0])
-                e_line = int(end_idx.split('.')[0])
-                for l in range(s_line, e_line + 1):
-                    self.page_mapping[l] = span.page
-
-                key = (span.font_name, round(span.font_size, 1))
-                self.font_stats[key] = self.font_stats.get(key, 0) + 1
+                s_line, s_col = line, col
+                newlines = text_content.count("\n")
+                if newlines:
+                    line += newlines
+                    col = len(text_content) - text_content.rfind("\n") - 1
+                else:
+                    col += len(text_content)
+                buf.append(text_content)
+                records.append((span, f"{s_line}.{s_col}", f"{line}.{col}", s_line, line))
+
+        # One Tk call for the whole document
+        full_text = "".join(buf)
+        self.txt_output.insert("1.0", full_text)
+
+        # Second pass: mappings come straight from the recorded positions.
+        # records are in document order, so the span keys come out sorted.
+        font_keys = []
+        self._span_start_keys = []
+        self._span_lookup = []
+        for span, start_idx, end_idx, s_line, e_line in records:
+            self.span_mapping[span.page].append({
+                "bbox": span.bbox,
+                "start": start_idx,
+                "end": end_idx
+            })
+
+            self.font_spans.append({
+                "text": span.text,
+                "font": span.font_name,
+                "size": span.font_size,
+                "is_bold": getattr(span, 'is_bold', False),
+                "is_italic": getattr(span, 'is_italic', False),
+                "start": start_idx,
+                "end": end_idx
+            })
+
+            # Record a breakpoint only when the page changes; page_of_line
+            # answers per-line queries by bisecting the breakpoint array
+            if not self._page_break_pages or self._page_break_pages[-1] != span.page:
+                self._page_break_lines.append(s_line)
+                self._page_break_pages.append(span.page)
+
+            s_l, s_c = start_idx.split('.')
+            e_l, e_c = end_idx.split('.')
+            self._span_start_keys.append(int(s_l) * 10_000_000 + int(s_c))
+            self._span_lookup.append((int(e_l) * 10_000_000 + int(e_c),
+                                      span.page, self.font_spans[-1]))
+
+            font_keys.append((span.font_name, round(span.font_size, 1)))
+
+        # One C-level Counter.update instead of a get-then-set per span
+        self.font_stats.update(font_keys)
+
+        # Flat int64 copies of the span keys: searchsorted over contiguous
+        # arrays beats bisect over a list of boxed ints on click latency
+        self._span_key_arr = np.asarray(self._span_start_keys, dtype=np.int64)
+        self._span_end_arr = np.asarray([e for e, _, _ in self._span_lookup], dtype=np.int64)
+        self._span_page_arr = np.asarray([p for _, p, _ in self._span_lookup], dtype=np.int64)
+
+        self._build_span_arrays()
 
         self.status_var.set(f"Extraction complete. {len(self.font_spans)} text segments found.")
         self._log(f"EXTRACT spans={len(self.font_spans)} pages={len(all_pages)}")
-        self.recognizer.extracted_text = self.txt_output.get("1.0", tk.END)
+        # The buffer is already in Python; skip the full-document Tcl round
+        # trip. Tk's widget always ends with a newline, so mirror that.
+        self.recognizer.extracted_text = full_text if full_text.endswith("\n") else full_text + "\n"
         self._refresh_font_tree()
         
         if self.var_auto_analyze.get():
@@ -917,6 +1233,7 @@ class PDFTextRecognizerApp:
         # Clear UI
         self.tree_refs.delete(*self.tree_refs.get_children())
         self.citation_map = {}
+        self._bib_detail_report_rows = []
         
         self._job_id += 1
         my_job = self._job_id
@@ -937,33 +1254,9 @@ class PDFTextRecognizerApp:
 
         self._start_bg_task("CITE", my_job, compute, self._analyze_done)
     
-    def _analyze_done(self, payload, error, tb_str="", job_id=None):
-        """Populate UI with citation results (main thread)."""
-        # Discard stale callback (user switched file / re-triggered)
-        if job_id is not None and job_id != self._job_id:
-            return
-        self._set_busy(False)
-        
-        if error:
-            self._report_bg_error("CITE", error, tb_str)
-            try:
-                self.lbl_ref_status.config(text=f"Engine error: {error}")
-            except Exception:
-                pass
-            return
-
-        if payload is None:
-            # Cancelled/superseded. Nothing to do.
-            return
-
-        entries, debug_bundle = payload
-        
-        # Store debug_bundle for export
-        self._last_debug_bundle = debug_bundle
-        
-        # Display entries in tree with clean output contract
+    def _fill_ref_tree(self, entries):
+        """Insert engine entries into the reference tree. Returns row count."""
         matches_found = 0
-        
         for entry in entries:
             # --- HARD ASSERTS: only new engine contract allowed ---
             if not isinstance(getattr(entry, "ref_id", None), int):
@@ -974,23 +1267,23 @@ class PDFTextRecognizerApp:
             bib_detail = entry.bib_detail if entry.bib_detail else "No detail found."
             if isinstance(bib_detail, str) and ("Font:" in bib_detail or "Size:" in bib_detail):
                 raise RuntimeError(f"[CITE] Illegal Reference Details (legacy meta leaked): {bib_detail[:200]}")
-            
+
             if self.var_hide_no_detail.get() and bib_detail == "No detail found.":
                 continue
-            
+
             first_page = entry.first_page
             first_bbox = entry.first_bbox
-            
+
             display_id = f"[{entry.ref_id}]"
             if entry.count > 1:
                 display_id += f" (×{entry.count})"
-            
+
             item_id = self.tree_refs.insert("", tk.END, values=(
                 display_id,
                 bib_detail[:100] + "..." if len(bib_detail) > 100 else bib_detail,
                 first_page
             ))
-            
+
             tk_pos, match_len = self._find_citation_in_text(str(entry.ref_id))
             if tk_pos is None:
                 tk_pos = "1.0"
@@ -1007,9 +1300,51 @@ class PDFTextRecognizerApp:
                 'count': entry.count,
                 'confidence': entry.confidence,
             }
-            
+
             matches_found += 1
+        return matches_found
+
+    def _analyze_done(self, payload, error, tb_str="", job_id=None):
+        """Populate UI with citation results (main thread)."""
+        # Discard stale callback (user switched file / re-triggered)
+        if job_id is not None and job_id != self._job_id:
+            return
+        self._set_busy(False)
+        
+        if error:
+            self._report_bg_error("CITE", error, tb_str)
+            try:
+                self.lbl_ref_status.config(text=f"Engine error: {error}")
+            except Exception:
+                pass
+            return
+
+        if payload is None:
+            # Cancelled/superseded. Nothing to do.
+            return
+
+        entries, debug_bundle = payload
+        
+        # Store debug_bundle for export
+        self._last_debug_bundle = debug_bundle
         
+        # Display entries in tree with clean output contract. Hide the tree
+        # while filling it so Tk doesn't redraw once per inserted row.
+        matches_found = 0
+        self.tree_refs.configure(show='')
+        try:
+            matches_found = self._fill_ref_tree(entries)
+        finally:
+            self.tree_refs.configure(show='headings')
+
+        # Prebuild the bibliography rows for the debug report (section 4)
+        # while citation_map is fresh; export then just writes them out
+        self._bib_detail_report_rows = [
+            (d['ref_id'], d['bib_detail'][:150])
+            for d in self.citation_map.values()
+            if isinstance(d, dict) and d.get('bib_detail') not in (None, 'N/A', 'No detail found.')
+        ]
+
         # Build compact status line
         pages_list = sorted(debug_bundle.pages_in_entries)
         if pages_list:
@@ -1037,19 +1372,54 @@ class PDFTextRecognizerApp:
         else:
             self.btn_export_refs.config(state=tk.DISABLED)
     
+    def _build_citation_index(self):
+        """
+        Index citation marker positions with one regex pass over the
+        extracted text. Replaces per-entry Tk text searches, each of which
+        was a full linear scan of the widget in Tcl.
+        """
+        text = self.recognizer.extracted_text if self.recognizer else ""
+        # Line start offsets as one int64 array: every index<->offset
+        # conversion in the app bisects this table
+        starts = [0]
+        pos = text.find('\n')
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = text.find('\n', pos + 1)
+        self._line_starts = np.asarray(starts, dtype=np.int64)
+        # First occurrence per ref id at the best available preference:
+        # 0 = [n], 1 = bare n, 2 = (n)
+        self._ref_positions = {}
+        for m in _CITATION_SCAN_RE.finditer(text):
+            if m.group(1) is not None:
+                key, prio = m.group(1), 0
+            elif m.group(2) is not None:
+                key, prio = m.group(2), 2
+            else:
+                key, prio = m.group(3), 1
+            cur = self._ref_positions.get(key)
+            if cur is None or prio < cur[2]:
+                self._ref_positions[key] = (m.start(), m.end() - m.start(), prio)
+
+    def _offset_to_tk_index(self, offset: int) -> str:
+        """Convert a character offset in extracted_text to a Tk text index."""
+        line = int(np.searchsorted(self._line_starts, offset, side='right'))
+        return f"{line}.{offset - int(self._line_starts[line - 1])}"
+
     def _find_citation_in_text(self, ref_key: str) -> Tuple[Optional[str], int]:
         """
         Find citation marker position in text output.
-        
+
         Returns:
             Tuple of (position, matched_length) or (None, 0) if not found
         """
-        patterns = [f"[{ref_key}]", ref_key, f"({ref_key})"]
-        for pattern in patterns:
-            pos = self.txt_output.search(pattern, "1.0", stopindex=tk.END)
-            if pos:
-                return pos, len(pattern)
-        return None, 0
+        if self._ref_positions is None:
+            self._build_citation_index()
+        hit = self._ref_positions.get(str(ref_key))
+        if hit is None:
+            return None, 0
+        offset, length, _ = hit
+        return self._offset_to_tk_index(offset), length
 
     def _on_ref_select(self, event):
         item_id = self.tree_refs.focus()
@@ -1109,20 +1479,11 @@ class PDFTextRecognizerApp:
                     if target_bbox: break
             
             if target_page and target_bbox:
+                # Stash the highlight; _display_page draws it after the
+                # page image is painted, whether the render is a
+                # synchronous cache hit or lands from the worker later
+                self._pending_highlight = (target_page, target_bbox)
                 self._show_pdf_page(target_page)
-                
-                # Draw highlight on canvas (consistent scale: pdf_zoom)
-                if target_page in self.pdf_images:
-                    scale = self.pdf_zoom  # PDF points * zoom = display pixels
-                    x0, top, x1, bottom = target_bbox
-                    
-                    c_x0 = x0 * scale
-                    c_top = top * scale
-                    c_x1 = x1 * scale
-                    c_bottom = bottom * scale
-                    
-                    self.canvas_pdf.create_rectangle(c_x0, c_top, c_x1, c_bottom, outline="red", width=3, tags="ref_highlight")
-                    self.status_var.set(f"Located on Page {target_page}")
 
     def _export_debug_report(self):
         """Export a complete debug report as TXT file"""
@@ -1138,227 +1499,246 @@ class PDFTextRecognizerApp:
             return
         
         try:
-            report_lines = []
-            report_lines.append("=" * 70)
-            report_lines.append("PDF CITATION EXTRACTION - DEBUG REPORT")
-            report_lines.append("=" * 70)
-            report_lines.append(f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            report_lines.append(f"PDF File: {self.recognizer.pdf_path if self.recognizer else 'N/A'}")
-            report_lines.append("")
+            # Stream lines straight to the buffered file handle; collecting
+            # them in a list and joining doubled peak memory on big documents
+            out = open(filename, 'w', encoding='utf-8', buffering=1 << 16)
+            def emit(line):
+                out.write(line)
+                out.write('\n')
+
+            emit("=" * 70)
+            emit("PDF CITATION EXTRACTION - DEBUG REPORT")
+            emit("=" * 70)
+            emit(f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            emit(f"PDF File: {self.recognizer.pdf_path if self.recognizer else 'N/A'}")
+            emit("")
             
             # Section 1: Engine Statistics
-            report_lines.append("-" * 70)
-            report_lines.append("1. ENGINE STATISTICS")
-            report_lines.append("-" * 70)
+            emit("-" * 70)
+            emit("1. ENGINE STATISTICS")
+            emit("-" * 70)
             
             debug_bundle = self.recognizer.get_engine_debug() if self.recognizer else None
             if debug_bundle:
-                report_lines.append(f"  Bibliography IDs Count: {debug_bundle.bib_ids_count}")
-                report_lines.append(f"  Bibliography Map Count: {debug_bundle.bib_map_count}")
-                report_lines.append(f"  Bracket Candidates Count: {debug_bundle.bracket_candidates_count}")
-                report_lines.append(f"  Superscript Candidates Count: {debug_bundle.superscript_candidates_count}")
-                report_lines.append(f"  Final Entries Count: {debug_bundle.entries_count}")
-                report_lines.append(f"  Total Occurrences: {debug_bundle.total_occurrences}")
+                emit(f"  Bibliography IDs Count: {debug_bundle.bib_ids_count}")
+                emit(f"  Bibliography Map Count: {debug_bundle.bib_map_count}")
+                emit(f"  Bracket Candidates Count: {debug_bundle.bracket_candidates_count}")
+                emit(f"  Superscript Candidates Count: {debug_bundle.superscript_candidates_count}")
+                emit(f"  Final Entries Count: {debug_bundle.entries_count}")
+                emit(f"  Total Occurrences: {debug_bundle.total_occurrences}")
                 
                 if debug_bundle.bib_ids_sample:
-                    report_lines.append(f"  Bib IDs Sample: {debug_bundle.bib_ids_sample[:20]}")
+                    emit(f"  Bib IDs Sample: {debug_bundle.bib_ids_sample[:20]}")
                 
                 # NEW_ENGINE EXTRA section
-                report_lines.append("")
-                report_lines.append("  --- NEW_ENGINE EXTRA ---")
-                report_lines.append(f"  global_body_size: {debug_bundle.global_body_size:.2f}")
-                report_lines.append(f"  bib_hard_constraint_used: {debug_bundle.bib_hard_constraint_used}")
-                report_lines.append(f"  pages_with_sup_candidates: {debug_bundle.pages_with_sup_candidates}")
-                report_lines.append(f"  pages_in_entries: {sorted(debug_bundle.pages_in_entries)}")
+                emit("")
+                emit("  --- NEW_ENGINE EXTRA ---")
+                emit(f"  global_body_size: {debug_bundle.global_body_size:.2f}")
+                emit(f"  bib_hard_constraint_used: {debug_bundle.bib_hard_constraint_used}")
+                emit(f"  pages_with_sup_candidates: {debug_bundle.pages_with_sup_candidates}")
+                emit(f"  pages_in_entries: {sorted(debug_bundle.pages_in_entries)}")
                 
                 # Superscript per-page stats table
                 if debug_bundle.sup_per_page_stats:
-                    report_lines.append("")
-                    report_lines.append("  --- SUPERSCRIPT PER-PAGE STATS ---")
+                    emit("")
+                    emit("  --- SUPERSCRIPT PER-PAGE STATS ---")
                     for stat_line in debug_bundle.sup_per_page_stats:
-                        report_lines.append(f"  {stat_line}")
+                        emit(f"  {stat_line}")
             else:
-                report_lines.append("  [Engine debug info not available]")
-            report_lines.append("")
+                emit("  [Engine debug info not available]")
+            emit("")
             
             # Section 2: Font Statistics
-            report_lines.append("-" * 70)
-            report_lines.append("2. FONT STATISTICS")
-            report_lines.append("-" * 70)
+            emit("-" * 70)
+            emit("2. FONT STATISTICS")
+            emit("-" * 70)
             
             if self.font_stats:
                 sorted_fonts = sorted(self.font_stats.items(), key=lambda x: x[1], reverse=True)
-                report_lines.append(f"  Total unique font/size combinations: {len(sorted_fonts)}")
-                report_lines.append("  Top 20 fonts by occurrence:")
+                emit(f"  Total unique font/size combinations: {len(sorted_fonts)}")
+                emit("  Top 20 fonts by occurrence:")
                 for i, ((font, size), count) in enumerate(sorted_fonts[:20], 1):
-                    report_lines.append(f"    {i:2}. {font} @ {size}pt: {count} chars")
+                    emit(f"    {i:2}. {font} @ {size}pt: {count} chars")
             else:
-                report_lines.append("  [No font data available]")
-            report_lines.append("")
+                emit("  [No font data available]")
+            emit("")
             
             # Section 3: Citation Entries
-            report_lines.append("-" * 70)
-            report_lines.append("3. CITATION ENTRIES")
-            report_lines.append("-" * 70)
+            emit("-" * 70)
+            emit("3. CITATION ENTRIES")
+            emit("-" * 70)
             
             entries = self.recognizer.get_engine_entries() if self.recognizer else []
-            report_lines.append(f"  Total entries: {len(entries)}")
-            report_lines.append("")
+            emit(f"  Total entries: {len(entries)}")
+            emit("")
             
             for entry in entries:
-                report_lines.append(f"  [{entry.ref_id}]")
-                report_lines.append(f"    Count: {entry.count}")
-                report_lines.append(f"    Source: {entry.source_str}")
-                report_lines.append(f"    Confidence: {entry.confidence:.2f}")
-                report_lines.append(f"    First Page: {entry.first_page}")
-                report_lines.append(f"    Bib Detail: {entry.bib_detail[:100] + '...' if entry.bib_detail and len(entry.bib_detail) > 100 else entry.bib_detail or 'None'}")
+                emit(f"  [{entry.ref_id}]")
+                emit(f"    Count: {entry.count}")
+                emit(f"    Source: {entry.source_str}")
+                emit(f"    Confidence: {entry.confidence:.2f}")
+                emit(f"    First Page: {entry.first_page}")
+                emit(f"    Bib Detail: {entry.bib_detail[:100] + '...' if entry.bib_detail and len(entry.bib_detail) > 100 else entry.bib_detail or 'None'}")
                 
                 # List occurrences
                 if entry.occurrences:
-                    report_lines.append(f"    Occurrences ({len(entry.occurrences)}):")
+                    emit(f"    Occurrences ({len(entry.occurrences)}):")
                     for j, occ in enumerate(entry.occurrences[:10], 1):
-                        report_lines.append(f"      {j}. Page {occ.page}, Line {occ.line_id}, Source {occ.source}")
+                        emit(f"      {j}. Page {occ.page}, Line {occ.line_id}, Source {occ.source}")
                     if len(entry.occurrences) > 10:
-                        report_lines.append(f"      ... and {len(entry.occurrences) - 10} more")
-                report_lines.append("")
+                        emit(f"      ... and {len(entry.occurrences) - 10} more")
+                emit("")
             
             # Section 3.5: Detected Ref IDs Summary (compact)
-            report_lines.append("-" * 70)
-            report_lines.append("3.5. DETECTED REF IDS SUMMARY")
-            report_lines.append("-" * 70)
+            emit("-" * 70)
+            emit("3.5. DETECTED REF IDS SUMMARY")
+            emit("-" * 70)
             if entries:
                 ref_ids_list = [e.ref_id for e in entries]
-                report_lines.append(f"  Ref IDs: {ref_ids_list}")
-                report_lines.append("")
-                report_lines.append("  Quick Table:")
-                report_lines.append(f"  {'RefID':<8} {'Count':<8} {'Source':<20} {'Conf':<8} {'1stPage':<8}")
-                report_lines.append("  " + "-" * 52)
+                emit(f"  Ref IDs: {ref_ids_list}")
+                emit("")
+                emit("  Quick Table:")
+                emit(f"  {'RefID':<8} {'Count':<8} {'Source':<20} {'Conf':<8} {'1stPage':<8}")
+                emit("  " + "-" * 52)
                 for entry in entries:
-                    report_lines.append(
+                    emit(
                         f"  {entry.ref_id:<8} {entry.count:<8} {entry.source_str:<20} "
                         f"{entry.confidence:<8.2f} {entry.first_page:<8}"
                     )
             else:
-                report_lines.append("  [No entries detected]")
-            report_lines.append("")
+                emit("  [No entries detected]")
+            emit("")
             
             # Section 3.6: Coverage Check (diagnostic)
-            report_lines.append("-" * 70)
-            report_lines.append("3.6. COVERAGE CHECK (WHY ENTRIES MAY BE FEW)")
-            report_lines.append("-" * 70)
+            emit("-" * 70)
+            emit("3.6. COVERAGE CHECK (WHY ENTRIES MAY BE FEW)")
+            emit("-" * 70)
             if debug_bundle:
                 pages_in = sorted(debug_bundle.pages_in_entries)
                 pages_with_sup = debug_bundle.pages_with_sup_candidates
                 
-                report_lines.append(f"  entries_count: {debug_bundle.entries_count}")
-                report_lines.append(f"  pages_in_entries: {len(pages_in)} pages -> {pages_in}")
-                report_lines.append(f"  pages_with_sup_candidates: {len(pages_with_sup)} pages -> {pages_with_sup}")
-                report_lines.append(f"  bib_ids_count: {debug_bundle.bib_ids_count}")
-                report_lines.append(f"  bib_hard_constraint_used: {debug_bundle.bib_hard_constraint_used}")
-                report_lines.append("")
+                emit(f"  entries_count: {debug_bundle.entries_count}")
+                emit(f"  pages_in_entries: {len(pages_in)} pages -> {pages_in}")
+                emit(f"  pages_with_sup_candidates: {len(pages_with_sup)} pages -> {pages_with_sup}")
+                emit(f"  bib_ids_count: {debug_bundle.bib_ids_count}")
+                emit(f"  bib_hard_constraint_used: {debug_bundle.bib_hard_constraint_used}")
+                emit("")
                 
                 # Diagnosis
-                report_lines.append("  --- DIAGNOSIS ---")
+                emit("  --- DIAGNOSIS ---")
                 if debug_bundle.entries_count == 0:
-                    report_lines.append("  ! entries_count=0: No citations detected at all.")
+                    emit("  ! entries_count=0: No citations detected at all.")
                     if debug_bundle.superscript_candidates_count == 0 and debug_bundle.bracket_candidates_count == 0:
-                        report_lines.append("    -> Both channels produced 0 candidates. Check PDF structure.")
+                        emit("    -> Both channels produced 0 candidates. Check PDF structure.")
                     elif debug_bundle.bib_hard_constraint_used and debug_bundle.bib_ids_count > 0:
-                        report_lines.append("    -> Bib hard constraint ON but may be filtering everything.")
+                        emit("    -> Bib hard constraint ON but may be filtering everything.")
                 elif len(pages_in) <= 2 and len(pages_with_sup) > len(pages_in):
-                    report_lines.append("  ! pages_in_entries covers few pages but sup_candidates found on more.")
-                    report_lines.append("    -> Likely: ref_ids from sup_candidates not matching bib_ids.")
-                    report_lines.append("    -> Check bib_hard_constraint_used and bib_ids_sample.")
+                    emit("  ! pages_in_entries covers few pages but sup_candidates found on more.")
+                    emit("    -> Likely: ref_ids from sup_candidates not matching bib_ids.")
+                    emit("    -> Check bib_hard_constraint_used and bib_ids_sample.")
                 elif len(pages_with_sup) <= 2:
-                    report_lines.append("  ! pages_with_sup_candidates covers few pages.")
-                    report_lines.append("    -> Likely: superscript geometric detection failing on most pages.")
-                    report_lines.append("    -> Check sup_per_page_stats for reject reasons.")
+                    emit("  ! pages_with_sup_candidates covers few pages.")
+                    emit("    -> Likely: superscript geometric detection failing on most pages.")
+                    emit("    -> Check sup_per_page_stats for reject reasons.")
                 elif debug_bundle.entries_count < 10 and debug_bundle.bib_ids_count < 10:
-                    report_lines.append("  ! Both entries and bib_ids are low.")
-                    report_lines.append("    -> Bibliography extraction may have failed or PDF has few refs.")
+                    emit("  ! Both entries and bib_ids are low.")
+                    emit("    -> Bibliography extraction may have failed or PDF has few refs.")
                 else:
-                    report_lines.append("  Coverage looks reasonable.")
+                    emit("  Coverage looks reasonable.")
             else:
-                report_lines.append("  [Debug bundle not available]")
-            report_lines.append("")
+                emit("  [Debug bundle not available]")
+            emit("")
             
             # Section 4: Bibliography Map (from engine)
-            report_lines.append("-" * 70)
-            report_lines.append("4. BIBLIOGRAPHY MAP (from engine)")
-            report_lines.append("-" * 70)
+            emit("-" * 70)
+            emit("4. BIBLIOGRAPHY MAP (from engine)")
+            emit("-" * 70)
             
             if debug_bundle and debug_bundle.bib_map_count > 0:
-                report_lines.append(f"  Total bib entries: {debug_bundle.bib_map_count}")
-                report_lines.append(f"  IDs sample: {sorted(debug_bundle.bib_ids_sample[:30]) if debug_bundle.bib_ids_sample else 'N/A'}")
-                # Show per-entry bib_detail from citation_map
-                for item_id, data in self.citation_map.items():
-                    if isinstance(data, dict):
-                        rid = data.get('ref_id', '?')
-                        detail = data.get('bib_detail', 'N/A')
-                        if detail and detail != "No detail found.":
-                            report_lines.append(f"  [{rid}]: {detail[:150]}")
+                emit(f"  Total bib entries: {debug_bundle.bib_map_count}")
+                emit(f"  IDs sample: {sorted(debug_bundle.bib_ids_sample[:30]) if debug_bundle.bib_ids_sample else 'N/A'}")
+                # Rows were prebuilt (and filtered) at analysis time
+                for rid, detail in self._bib_detail_report_rows:
+                    emit(f"  [{rid}]: {detail}")
             else:
-                report_lines.append("  [No bibliography detected by engine]")
-            report_lines.append("")
+                emit("  [No bibliography detected by engine]")
+            emit("")
             
             # Section 5: Extraction Statistics (no raw text to avoid leaking document content)
-            report_lines.append("-" * 70)
-            report_lines.append("5. EXTRACTION STATISTICS")
-            report_lines.append("-" * 70)
+            emit("-" * 70)
+            emit("5. EXTRACTION STATISTICS")
+            emit("-" * 70)
             
             if self.recognizer and self.recognizer.extracted_text:
-                txt = self.recognizer.extracted_text
-                report_lines.append(f"  Total chars: {len(txt)}")
-                report_lines.append(f"  Total lines: {txt.count(chr(10))}")
-                report_lines.append(f"  Font spans tracked: {len(self.font_spans)}")
+                emit(f"  Total chars: {self.recognizer.extracted_text_len}")
+                emit(f"  Total lines: {self.recognizer.extracted_text_nlines}")
+                emit(f"  Font spans tracked: {len(self.font_spans)}")
             else:
-                report_lines.append("  [No extracted text available]")
-            report_lines.append("")
+                emit("  [No extracted text available]")
+            emit("")
             
             # Section 6: Span Mapping Summary
-            report_lines.append("-" * 70)
-            report_lines.append("6. SPAN MAPPING SUMMARY")
-            report_lines.append("-" * 70)
+            emit("-" * 70)
+            emit("6. SPAN MAPPING SUMMARY")
+            emit("-" * 70)
             
             if self.span_mapping:
-                report_lines.append(f"  Pages with spans: {len(self.span_mapping)}")
+                emit(f"  Pages with spans: {len(self.span_mapping)}")
                 for page, spans in sorted(self.span_mapping.items()):
-                    report_lines.append(f"    Page {page}: {len(spans)} spans")
+                    emit(f"    Page {page}: {len(spans)} spans")
             else:
-                report_lines.append("  [No span mapping available]")
-            report_lines.append("")
-            
-            report_lines.append("=" * 70)
-            report_lines.append("END OF DEBUG REPORT")
-            report_lines.append("=" * 70)
+                emit("  [No span mapping available]")
+            emit("")
             
-            # Write to file
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(report_lines))
+            emit("=" * 70)
+            emit("END OF DEBUG REPORT")
+            emit("=" * 70)
             
+            out.close()
+
             messagebox.showinfo("Export", f"Debug report exported successfully!\n\n{filename}")
             
         except Exception as e:
+            try:
+                out.close()
+            except Exception:
+                pass
             messagebox.showerror("Error", f"Failed to export debug report:\n{e}")
 
     def _refresh_font_tree(self):
         # Clear
         for item in self.tree_fonts.get_children():
             self.tree_fonts.delete(item)
-        self.tree_items = []
-        
-        # Sort by count desc
-        sorted_stats = sorted(self.font_stats.items(), key=lambda x: x[1], reverse=True)
-        
+        self._ti_ids = []
+        self._ti_fonts = []
+        self._ti_size_strs = []
+
+        # Top-K heap select (Counter.most_common uses heapq.nlargest) —
+        # rows past the cap are inserted after_idle so a document with
+        # thousands of (font, size) pairs doesn't stall the refresh
+        top_stats = self.font_stats.most_common(self._FONT_TREE_TOP_K)
+        shown = set(top_stats)
+        rest = [kv for kv in self.font_stats.items() if kv not in shown]
+        rest.sort(key=lambda x: x[1], reverse=True)
+
         unique_fonts = set()
         unique_sizes = set()
-        
-        for (font, size), count in sorted_stats:
-            item_id = self.tree_fonts.insert("", tk.END, values=(font, size, count))
-            self.tree_items.append((item_id, font, size, count))
+
+        for font, size in self.font_stats:
             unique_fonts.add(font)
             unique_sizes.add(size)
-            
+
+        def insert_rows(stats):
+            for (font, size), count in stats:
+                item_id = self.tree_fonts.insert("", tk.END, values=(font, size, count))
+                self._ti_ids.append(item_id)
+                self._ti_fonts.append(font)
+                self._ti_size_strs.append(str(size))
+
+        insert_rows(top_stats)
+        if rest:
+            self.root.after_idle(lambda: insert_rows(rest))
+
         # Update Filters
         font_list = ["All Fonts"] + sorted(list(unique_fonts))
         size_list = ["All Sizes"] + sorted([str(s) for s in list(unique_sizes)])
@@ -1371,18 +1751,19 @@ class PDFTextRecognizerApp:
     def _filter_fonts(self, event=None):
         name_filter = self.combo_filter_name.get()
         size_filter = self.combo_filter_size.get()
-        
-        # Detach all
-        for item in self.tree_fonts.get_children():
-            self.tree_fonts.detach(item)
-            
-        # Re-attach matches
-        for item_id, font, size, count in self.tree_items:
-            match_name = (name_filter == "All Fonts" or name_filter == font)
-            match_size = (size_filter == "All Sizes" or size_filter == str(size))
-            
-            if match_name and match_size:
-                self.tree_fonts.move(item_id, "", tk.END)
+
+        # Compute the visible rows in Python and apply them with a single
+        # set_children call; detach+move per row crossed into Tcl 2N times.
+        # Columns are parallel lists so only font/size strings are touched.
+        any_name = name_filter == "All Fonts"
+        any_size = size_filter == "All Sizes"
+        matches = [
+            item_id for item_id, font, size_str
+            in zip(self._ti_ids, self._ti_fonts, self._ti_size_strs)
+            if (any_name or name_filter == font)
+            and (any_size or size_filter == size_str)
+        ]
+        self.tree_fonts.set_children("", *matches)
 
     def _on_font_tree_double_click(self, event):
         self._select_font_from_tree()
@@ -1400,17 +1781,32 @@ class PDFTextRecognizerApp:
         # Switch to Text tab
         self.notebook.select(self.tab_text)
 
+    def _span_at_index(self, idx):
+        """
+        Resolve a Tk text index to its (page, font_span) by bisecting the
+        sorted span-start keys — one lookup instead of a Text.compare pair
+        per span across the whole document.
+        """
+        if self._span_key_arr is None or not len(self._span_key_arr):
+            return None, None
+        line, col = map(int, idx.split('.'))
+        key = line * 10_000_000 + col
+        i = int(np.searchsorted(self._span_key_arr, key, side='right')) - 1
+        if i < 0:
+            return None, None
+        if key < self._span_end_arr[i]:
+            return int(self._span_page_arr[i]), self._span_lookup[i][2]
+        return None, None
+
     def _on_text_click(self, event):
         if not self.span_mapping: return
         try:
             idx = self.txt_output.index(f"@{event.x},{event.y}")
-            # Scan current page vicinity is faster, but simple iteration works for now
-            # Improved: range check using span_mapping directly
-            for page, spans in self.span_mapping.items():
-                for s in spans:
-                    if self.txt_output.compare(idx, ">=", s["start"]) and self.txt_output.compare(idx, "<", s["end"]):
-                        self._show_pdf_page(page)
-                        return
+            # One bisect over the document-wide key arrays; no per-page (or
+            # page-scoped) span iteration is needed at all
+            page, _ = self._span_at_index(idx)
+            if page is not None:
+                self._show_pdf_page(page)
         except Exception as e:
             self.status_var.set(f"Text click error: {e}")
 
@@ -1420,16 +1816,10 @@ class PDFTextRecognizerApp:
         try:
             index = self.txt_output.index(f"@{event.x},{event.y}")
             self.context_menu_data = {'index': index, 'event': event} # Save for sync
-            
-            if self.font_spans:
-                clicked_font = None
-                for span in self.font_spans:
-                    if self.txt_output.compare(index, ">=", span["start"]) and \
-                       self.txt_output.compare(index, "<", span["end"]):
-                        clicked_font = span
-                        break
-                if clicked_font:
-                    self.click_font_info = clicked_font
+
+            _, clicked_font = self._span_at_index(index)
+            if clicked_font:
+                self.click_font_info = clicked_font
         except: pass
         self._show_context_menu(event, 'text')
 
@@ -1470,12 +1860,16 @@ class PDFTextRecognizerApp:
         target_font = self.click_font_info["font"]
         target_size = self.click_font_info["size"]
         self._clear_selection()
-        count = 0
+        # tag_add takes alternating start/end args, so all ranges go over in
+        # one Tcl call instead of one per span
+        args = []
         for span in self.font_spans:
             if span["font"] == target_font and abs(span["size"] - target_size) < 0.5:
-                self.txt_output.tag_add("font_selection", span["start"], span["end"])
-                self.match_items.append((span["start"], span["end"]))
-                count += 1
+                args.extend((span["start"], span["end"]))
+        count = len(args) // 2
+        if args:
+            self.txt_output.tag_add("font_selection", *args)
+            self.match_items.extend(zip(args[0::2], args[1::2]))
         if self.match_items:
             self.current_match_index = 0
             self._highlight_current_match()
@@ -1486,14 +1880,29 @@ class PDFTextRecognizerApp:
         query = self.search_entry.get()
         if not query: return
         self._clear_selection()
-        start = "1.0"
-        while True:
-            start = self.txt_output.search(query, start, stopindex=tk.END, nocase=True)
-            if not start: break
-            end = f"{start}+{len(query)}c"
-            self.txt_output.tag_add("match", start, end)
-            self.match_items.append((start, end))
-            start = end
+        args = []
+        txt = self.recognizer.extracted_text if self.recognizer else ""
+        if txt:
+            # Find matches in Python and convert offsets with the line-start
+            # table — no per-hit Tk search round-trips
+            if self._ref_positions is None:
+                self._build_citation_index()
+            for m in re.finditer(re.escape(query), txt, re.IGNORECASE):
+                args.extend((self._offset_to_tk_index(m.start()),
+                             self._offset_to_tk_index(m.end())))
+        else:
+            # No extracted buffer yet: fall back to the widget's own search
+            start = "1.0"
+            while True:
+                start = self.txt_output.search(query, start, stopindex=tk.END, nocase=True)
+                if not start: break
+                end = f"{start}+{len(query)}c"
+                args.extend((start, end))
+                start = end
+        if args:
+            # One batched tag_add for every hit
+            self.txt_output.tag_add("match", *args)
+            self.match_items.extend(zip(args[0::2], args[1::2]))
         if self.match_items:
             self.current_match_index = 0
             self._highlight_current_match()
@@ -1507,8 +1916,7 @@ class PDFTextRecognizerApp:
         self.txt_output.see(start)
         try:
             line_num = int(start.split('.')[0])
-            target_page = self.page_mapping.get(line_num, 1)
-            self._show_pdf_page(target_page)
+            self._show_pdf_page(self.page_of_line(line_num))
         except: pass
 
     def _next_match(self):
@@ -1537,31 +1945,36 @@ class PDFTextRecognizerApp:
         if self.recognizer and self.recognizer.extracted_text:
             self.root.clipboard_clear()
             self.root.clipboard_append(self.recognizer.extracted_text)
-    def _save_text(self): 
+    def _save_text(self):
         path = filedialog.asksaveasfilename(defaultextension=".txt")
         if path and self.recognizer:
-            with open(path, 'w', encoding='utf-8') as f: f.write(self.recognizer.extracted_text)
+            # Large buffer + 1 MiB slices: multi-MB extractions go out in a
+            # few big writes instead of the default 8 KiB trickle
+            chunk = 1 << 20
+            text = self.recognizer.extracted_text
+            with open(path, 'w', encoding='utf-8', buffering=chunk) as f:
+                for i in range(0, len(text), chunk):
+                    f.write(text[i:i + chunk])
 
     # --- Custom Toggle Logic ---
 
 
     def _draw_toggle_switch(self):
-        self.cv_switch.delete("all")
         is_on = self.var_auto_analyze.get()
-        
+
         # Colors (iOS style)
         bg_color = "#34c759" if is_on else "#e5e5ea" # Cleaner Light Grey
-        thumb_color = "#ffffff"
-        
-        # Draw Pill (Line with Round Cap)
-        self.cv_switch.create_line(12, 12, 32, 12, width=22, capstyle=tk.ROUND, fill=bg_color, tags="bg")
-        
-        # Draw Thumb
-        if is_on:
-            x = 32
+        thumb_x = 32 if is_on else 12
+
+        # Create the pill + thumb once; later toggles just recolor/move them
+        if self._sw_bg is None:
+            self._sw_bg = self.cv_switch.create_line(
+                12, 12, 32, 12, width=22, capstyle=tk.ROUND, fill=bg_color, tags="bg")
+            self._sw_thumb = self.cv_switch.create_oval(
+                thumb_x - 10, 2, thumb_x + 10, 22, fill="#ffffff", outline="", tags="thumb")
         else:
-            x = 12
-        self.cv_switch.create_oval(x-10, 2, x+10, 22, fill=thumb_color, outline="", tags="thumb")
+            self.cv_switch.itemconfig(self._sw_bg, fill=bg_color)
+            self.cv_switch.coords(self._sw_thumb, thumb_x - 10, 2, thumb_x + 10, 22)
         
     def _toggle_analyze_switch(self, event):
         new_val = not self.var_auto_analyze.get()
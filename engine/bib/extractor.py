@@ -5,10 +5,14 @@ Extracts bibliography section and parses reference IDs.
 Provides constraint set for citation validation.
 """
 
+import itertools
 import re
 from typing import Dict, Set, List, Optional, Tuple, Union
 from ..types import Bibliography
 
+# Whitespace normalizer shared by entry parsing
+_WS_RE = re.compile(r'\s+')
+
 
 class BibliographyExtractor:
     """
@@ -37,7 +41,20 @@ class BibliographyExtractor:
         (r'^\s*(\d+)\.', 'dot'),           # 1. Author...
         (r'^\s*\((\d+)\)', 'paren'),       # (1) Author...
     ]
-    
+
+    # Compiled once at class load; per-extraction re.findall on the raw
+    # strings paid a re-cache lookup per call
+    _COMPILED_ENTRY_PATTERNS = [
+        (re.compile(p, re.MULTILINE), t) for (p, t) in ENTRY_PATTERNS
+    ]
+    _SEQ_BRACKET_RE = re.compile(r'\[(\d+)\]')
+    _SEQ_DOT_RE = re.compile(r'\n\s*(\d+)\.\s+[A-Z]')
+    _SEQ_STR = [str(i) for i in range(1, 4)]  # expected prefix "1","2","3"
+    _CONTENT_START_PATTERNS = [
+        re.compile(r'\n\s*\[1\]'),        # [1]
+        re.compile(r'\n\s*1\.\s+[A-Z]'),  # 1. followed by capital letter
+    ]
+
     def __init__(self):
         self._header_regex = re.compile(
             '|'.join(f'({p})' for p in self.HEADER_PATTERNS),
@@ -84,63 +101,56 @@ class BibliographyExtractor:
         Find bibliography section by header.
         Returns (start_position, section_text).
         """
-        # Search for headers in last 60% of document
+        # Search for headers in last 60% of document. Passing pos= scans the
+        # original string in place instead of copying 60% of the document.
         search_start = int(len(text) * 0.4)
-        search_text = text[search_start:]
-        
-        match = self._header_regex.search(search_text)
+
+        match = self._header_regex.search(text, search_start)
         if match:
-            # Find end of header line
-            header_end = match.end()
             # Look for next newline to start parsing entries
-            newline_pos = search_text.find('\n', header_end)
+            newline_pos = text.find('\n', match.end())
             if newline_pos == -1:
-                newline_pos = header_end
-            
-            section_text = search_text[newline_pos:].strip()
-            return search_start + match.start(), section_text
-        
+                newline_pos = match.end()
+
+            section_text = text[newline_pos:].strip()
+            return match.start(), section_text
+
         return -1, ""
     
     def _detect_by_content(self, text: str) -> Tuple[int, str]:
         """
         Fallback: Detect bibliography by sequential entry pattern [1], [2], [3]...
         """
-        # Search last 50% of document
+        # Search last 50% of document, in place (no substring copy)
         search_start = int(len(text) * 0.5)
-        search_text = text[search_start:]
-        
+
         # Look for start of numbered list: [1] or 1.
-        patterns_to_try = [
-            r'\n\s*\[1\]',    # [1]
-            r'\n\s*1\.\s+[A-Z]',  # 1. followed by capital letter
-        ]
-        
-        for pattern in patterns_to_try:
-            match = re.search(pattern, search_text)
+        for pattern in self._CONTENT_START_PATTERNS:
+            match = pattern.search(text, search_start)
             if match:
                 # Check if followed by [2] or 2.
-                candidate_text = search_text[match.start():]
+                candidate_text = text[match.start():]
                 if self._has_sequential_entries(candidate_text):
-                    return search_start + match.start(), candidate_text
-        
+                    return match.start(), candidate_text
+
         return -1, ""
     
     def _has_sequential_entries(self, text: str, min_seq: int = 3) -> bool:
         """Check if text has sequential numbered entries"""
         # Look for [1], [2], [3] or 1., 2., 3.
-        bracket_matches = re.findall(r'\[(\d+)\]', text[:2000])
-        if len(bracket_matches) >= min_seq:
-            nums = [int(m) for m in bracket_matches[:min_seq]]
-            if nums == list(range(1, min_seq + 1)):
-                return True
-        
-        dot_matches = re.findall(r'\n\s*(\d+)\.\s+[A-Z]', text[:2000])
-        if len(dot_matches) >= min_seq:
-            nums = [int(m) for m in dot_matches[:min_seq]]
-            if nums == list(range(1, min_seq + 1)):
-                return True
-        
+        # Compare the raw match strings against the cached "1","2","3"
+        # prefix; no per-call int conversion or range list
+        expected = (self._SEQ_STR if min_seq == 3
+                    else [str(i) for i in range(1, min_seq + 1)])
+
+        bracket_matches = self._SEQ_BRACKET_RE.findall(text[:2000])
+        if bracket_matches[:min_seq] == expected:
+            return True
+
+        dot_matches = self._SEQ_DOT_RE.findall(text[:2000])
+        if dot_matches[:min_seq] == expected:
+            return True
+
         return False
     
     def _parse_entries(self, section_text: str) -> Tuple[Set[int], Dict[int, str]]:
@@ -156,44 +166,42 @@ class BibliographyExtractor:
         if pattern is None:
             return bib_ids, bib_map
         
-        # Find all entries
-        matches = list(re.finditer(pattern, section_text, re.MULTILINE))
-        
-        for i, match in enumerate(matches):
+        # Walk matches pairwise so the full match list is never materialized
+        it = pattern.finditer(section_text)
+        match = next(it, None)
+        for nxt in itertools.chain(it, [None]):
+            if match is None:
+                break
             ref_num = int(match.group(1))
-            
+
             # FILTER OUT YEARS: If >= 1000 and looks like a year, skip it
-            if ref_num >= 1000:
-                if self._is_likely_year(ref_num):
-                    continue
-            
+            if ref_num >= 1000 and self._is_likely_year(ref_num):
+                match = nxt
+                continue
+
             # Entry text: from end of match to start of next match (or end)
             start = match.end()
-            if i + 1 < len(matches):
-                end = matches[i + 1].start()
-            else:
-                end = len(section_text)
-            
-            entry_text = section_text[start:end].strip()
-            # Clean up entry text
-            entry_text = re.sub(r'\s+', ' ', entry_text)  # Normalize whitespace
-            entry_text = entry_text[:500]  # Limit length
-            
+            end = nxt.start() if nxt is not None else len(section_text)
+
+            # Normalize whitespace (precompiled) and limit length
+            entry_text = _WS_RE.sub(' ', section_text[start:end].strip())[:500]
+
             bib_ids.add(ref_num)
             bib_map[ref_num] = entry_text
-        
+            match = nxt
+
         return bib_ids, bib_map
     
-    def _detect_entry_pattern(self, text: str) -> Tuple[Optional[str], str]:
+    def _detect_entry_pattern(self, text: str) -> Tuple[Optional[re.Pattern], str]:
         """Detect which entry pattern is dominant"""
         sample = text[:3000]
-        
+
         best_pattern = None
         best_type = ""
         best_count = 0
-        
-        for pattern, ptype in self.ENTRY_PATTERNS:
-            count = len(re.findall(pattern, sample, re.MULTILINE))
+
+        for pattern, ptype in self._COMPILED_ENTRY_PATTERNS:
+            count = len(pattern.findall(sample))
             if count > best_count:
                 best_count = count
                 best_pattern = pattern
@@ -5,15 +5,22 @@ Detects bracketed citations like [1], [1-3], [1,3,5].
 High confidence, stable main detection channel.
 """
 
+import concurrent.futures
+import functools
+import itertools
 import re
+import sys
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 
 from ..types import (
-    Occurrence, CitationCandidate, Bibliography, normalize_ref_text, parse_ref_ids
+    Occurrence, CitationCandidate, Bibliography, normalize_and_parse
 )
 from ..page_model import PageData
 
+# Interned once so occurrence hashing compares by pointer
+_SRC_BRACKET = sys.intern("bracket")
+
 
 @dataclass
 class BracketConfig:
@@ -21,6 +28,12 @@ class BracketConfig:
     base_confidence: float = 0.9
     max_span: int = 20  # Max range like [1-20]
     require_bib_constraint: bool = True
+    # Fan per-page extraction out to worker processes for large documents.
+    # Off by default: the PyInstaller onefile build re-launches the bundle
+    # on process spawn unless freeze_support() is wired in, and page counts
+    # below parallel_min_pages don't amortize the pool startup anyway.
+    parallel: bool = False
+    parallel_min_pages: int = 8
 
 
 class BracketChannel:
@@ -55,13 +68,20 @@ class BracketChannel:
         Returns:
             List of CitationCandidate
         """
-        candidates = []
-        
-        for page in pages:
-            page_cands = self._process_page(page, bib)
-            candidates.extend(page_cands)
-        
-        return candidates
+        if self.config.parallel and len(pages) > self.config.parallel_min_pages:
+            # PageData/Bibliography are plain dataclasses, so they pickle
+            # as-is; chunksize keeps per-task IPC overhead low.
+            with concurrent.futures.ProcessPoolExecutor() as ex:
+                per_page = ex.map(
+                    functools.partial(self._process_page, bib=bib),
+                    pages, chunksize=8,
+                )
+                return list(itertools.chain.from_iterable(per_page))
+
+        # Single flattening pass over the per-page generators
+        return list(itertools.chain.from_iterable(
+            self._process_page(page, bib) for page in pages
+        ))
     
     def _process_page(
         self,
@@ -71,18 +91,25 @@ class BracketChannel:
         """Process single page using PageData locate_text_matches"""
         candidates: List[CitationCandidate] = []
 
+        # Hoist the constraint set: per-ID membership tests beat a
+        # bib.has_id() method dispatch for every parsed ID
+        bib_ids = bib.bib_ids if bib.is_valid() else None
+        require_bib = self.config.require_bib_constraint and bib_ids is not None
+
         for tm in page.locate_text_matches(self.BRACKET_PATTERN):
             raw = tm.match_text
-            norm = normalize_ref_text(raw)
-            ref_ids = parse_ref_ids(norm, max_span=self.config.max_span)
-            if not ref_ids:
+            # Memoized: bracket tokens repeat heavily across a document
+            _, ids = normalize_and_parse(raw, max_span=self.config.max_span)
+            if not ids:
                 continue
 
-            # Apply bib constraint
-            if bib.is_valid() and self.config.require_bib_constraint:
-                ref_ids = [r for r in ref_ids if bib.has_id(r)]
+            # Apply bib constraint (the cached tuple is never mutated)
+            if require_bib:
+                ref_ids = [r for r in ids if r in bib_ids]
                 if not ref_ids:
                     continue
+            else:
+                ref_ids = list(ids)
 
             anchor_left = page.get_left_context(tm.line_id, tm.bbox[0], max_chars=32)
 
@@ -90,7 +117,7 @@ class BracketChannel:
                 page=page.page_num,
                 bbox=tm.bbox,
                 line_id=tm.line_id,
-                source="bracket",
+                source=_SRC_BRACKET,
                 anchor_left=anchor_left,
             )
 
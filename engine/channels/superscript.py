@@ -4,15 +4,23 @@ Superscript Citation Channel (Phase 2)
 Detects superscript citations using geometric analysis.
 """
 
+import concurrent.futures
+import functools
+import sys
 from dataclasses import dataclass, field
 from typing import List, Set, Optional, Dict, Any, Tuple
 from collections import Counter, defaultdict
 
+import numpy as np
+
 from ..types import (
-    Occurrence, CitationCandidate, Bibliography, normalize_ref_text, parse_ref_ids
+    Occurrence, CitationCandidate, Bibliography, normalize_and_parse
 )
 from ..page_model import PageData
 
+# Interned once so occurrence hashing compares by pointer
+_SRC_SUPERSCRIPT = sys.intern("superscript")
+
 
 @dataclass
 class SupConfig:
@@ -46,11 +54,38 @@ class SupConfig:
     
     # Global body size (set by pipeline before extraction)
     global_body_size: Optional[float] = None
+
+    # Fan per-page extraction out to worker processes for large documents.
+    # Off by default: the PyInstaller onefile build re-launches the bundle
+    # on process spawn unless freeze_support() is wired in, and small
+    # documents don't amortize the pool startup anyway.
+    parallel: bool = False
+    parallel_min_pages: int = 8
     
     # Debug
     debug: bool = False
 
 
+@dataclass(slots=True)
+class SupEvidence:
+    """
+    Fixed-shape evidence for a superscript candidate.
+
+    Slots instead of a per-candidate dict: thousands of candidates on a
+    large document would otherwise each carry a six-key dict.
+    """
+    pattern: str
+    raw: str
+    zone: str
+    rise: float
+    base_size: float
+    tok_size: float
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style access shim for debug consumers."""
+        return getattr(self, key, default)
+
+
 @dataclass
 class PageSupStats:
     """Per-page statistics for debugging"""
@@ -116,190 +151,36 @@ class SuperscriptChannel:
         if self.config.debug:
             print(f"[SUP] global_body_size={global_base:.2f}, use_bib_hard={use_bib_hard}")
         
+        # Hoisted bib id set: direct membership beats a has_id() dispatch
+        # per parsed id in the token loop
+        bib_id_set = bib.bib_ids if (use_bib_hard and bib.is_valid()) else None
+
         cands: List[CitationCandidate] = []
-        
-        for page in pages:
-            stats = PageSupStats(page_num=page.page_num)
-            stats.lines_total = len(page.lines)
-            
-            for line in page.lines:
-                # Zone filter
-                if line.zone in self.config.zone_blocklist:
-                    stats.lines_in_zone_blocklist += 1
-                    continue
-                
-                # First page title block filter
-                if (self.config.first_page_title_block and 
-                    page.page_num == 1 and 
-                    line.zone == "title"):
-                    # Only block if in top portion
-                    line_mid = (line.top + line.bottom) / 2 if line.chars else 0
-                    if line_mid < page.height * self.config.first_page_title_cutoff:
-                        stats.lines_in_zone_blocklist += 1
-                        continue
-                
-                # Use global base size, but allow page/line to influence slightly
-                line_body_size = line.body_size or global_base
-                # Use minimum of global and line (more conservative baseline)
-                base_size = min(global_base, line_body_size) if line_body_size > 0 else global_base
-                
-                baseline_y = line.body_baseline
-                rise_thresh = self.config.rise_ratio * base_size
-                size_thresh = self.config.size_ratio * base_size
-                
-                # Candidate chars collection
-                sup_chars = []
-                prev_char = None
-                
-                for ch in line.chars:
-                    stats.chars_checked += 1
-                    t = ch.text
-                    if not t:
-                        prev_char = ch
-                        continue
-                    if t == ".":
-                        prev_char = ch
-                        continue
-                    
-                    # Character must be digit-like
-                    is_digit_like = (t.isdigit() or 
-                                   t in {",", "-", "–"} or 
-                                   any(c in "¹²³⁴⁵⁶⁷⁸⁹⁰" for c in t))
-                    if not is_digit_like:
-                        prev_char = ch
-                        continue
-                    
-                    # Method 1: Classic superscript detection (small AND raised)
-                    is_classic_sup = (
-                        ch.size <= size_thresh and 
-                        ch.mid_y < baseline_y - rise_thresh
-                    )
-                    
-                    # Method 2: Right-attach rule (allows near-body-size if raised and right of prev)
-                    is_right_attach = False
-                    if (self.config.right_attach_enabled and 
-                        prev_char is not None and
-                        not is_classic_sup):
-                        gap = ch.x0 - prev_char.x1
-                        # Check gap is reasonable
-                        if -1.0 <= gap <= base_size * self.config.right_attach_gap_max_ratio:
-                            # Check size is close to prev
-                            if ch.size <= prev_char.size * self.config.right_attach_size_ratio:
-                                # Check it's raised relative to prev (even slightly)
-                                if ch.mid_y < prev_char.mid_y - base_size * self.config.right_attach_rise_ratio:
-                                    is_right_attach = True
-                    
-                    if is_classic_sup or is_right_attach:
-                        sup_chars.append(ch)
-                        stats.chars_candidate += 1
-                    
-                    prev_char = ch
-                
-                if not sup_chars:
-                    continue
-                
-                # Merge adjacent chars into tokens by x-gap
-                sup_chars.sort(key=lambda c: c.x0)
-                tokens: List[List[Any]] = []
-                cur = [sup_chars[0]]
-                for nxt in sup_chars[1:]:
-                    prev = cur[-1]
-                    gap = max(0.0, nxt.x0 - prev.x1)
-                    if gap <= self.config.adjacent_gap_ratio * base_size:
-                        cur.append(nxt)
-                    else:
-                        tokens.append(cur)
-                        cur = [nxt]
-                tokens.append(cur)
-                stats.tokens_formed += len(tokens)
-                
-                for tok in tokens:
-                    raw = "".join(c.text for c in tok)
-                    
-                    # Raw filters
-                    if "." in raw:
-                        stats.tokens_rejected_dot += 1
-                        continue
-                    
-                    norm = normalize_ref_text(raw)
-                    
-                    # Digit-only constraints
-                    digits_only = norm.isdigit()
-                    if digits_only:
-                        if len(norm) > self.config.max_digits:
-                            stats.tokens_rejected_too_long += 1
-                            continue
-                        if len(norm) > 1 and norm.startswith("0"):
-                            stats.tokens_rejected_leading_zero += 1
-                            continue
-                        if norm == "0":
-                            stats.tokens_rejected_zero += 1
-                            continue
-                    
-                    ref_ids = parse_ref_ids(norm, max_span=20)
-                    if not ref_ids:
-                        stats.tokens_rejected_no_ids += 1
-                        continue
-                    
-                    # ID range filter
-                    ref_ids = [r for r in ref_ids if self.config.min_id <= r <= self.config.max_id]
-                    if not ref_ids:
-                        stats.tokens_rejected_id_range += 1
-                        continue
-                    
-                    # Bib constraint (if enabled and bib is valid and large enough)
-                    if use_bib_hard and bib.is_valid():
-                        filtered_ids = [r for r in ref_ids if bib.has_id(r)]
-                        if not filtered_ids:
-                            stats.tokens_rejected_bib += 1
-                            continue
-                        ref_ids = filtered_ids
-                    
-                    # Build candidate
-                    x0 = min(c.x0 for c in tok)
-                    top = min(c.top for c in tok)
-                    x1 = max(c.x1 for c in tok)
-                    bottom = max(c.bottom for c in tok)
-                    bbox = (x0, top, x1, bottom)
-                    anchor_left = page.get_left_context(line.line_id, x0, max_chars=32)
-                    
-                    tok_mid_y = (top + bottom) / 2.0
-                    rise = (baseline_y - tok_mid_y) / (base_size or 1.0)
-                    
-                    occ = Occurrence(
-                        page=page.page_num,
-                        bbox=bbox,
-                        line_id=line.line_id,
-                        source="superscript",
-                        anchor_left=anchor_left,
-                    )
-                    cand = CitationCandidate(
-                        ref_ids=ref_ids,
-                        occurrence=occ,
-                        evidence={
-                            "pattern": "superscript",
-                            "raw": raw,
-                            "zone": line.zone,
-                            "rise": rise,
-                            "base_size": base_size,
-                            "tok_size": sum(c.size for c in tok) / len(tok),
-                        },
-                        confidence=self.config.base_confidence,
-                    )
-                    cands.append(cand)
-                    stats.candidates_accepted += 1
-                    
-                    # Sample for debug
-                    if len(stats.sample_candidates) < 5:
-                        stats.sample_candidates.append({
-                            "raw": raw,
-                            "ref_ids": ref_ids,
-                            "rise": round(rise, 3),
-                            "anchor": anchor_left[:20] if anchor_left else "",
-                        })
-            
-            self.page_stats.append(stats)
-        
+
+        if (self.config.parallel and
+                len(pages) > self.config.parallel_min_pages):
+            # Pages share no mutable state, so per-page extraction maps
+            # cleanly onto worker processes for large documents
+            with concurrent.futures.ProcessPoolExecutor() as ex:
+                per_page = ex.map(
+                    functools.partial(
+                        self._extract_page,
+                        bib_id_set=bib_id_set,
+                        global_base=global_base,
+                    ),
+                    pages, chunksize=4,
+                )
+                for page_cands, stats in per_page:
+                    cands.extend(page_cands)
+                    self.page_stats.append(stats)
+        else:
+            for page in pages:
+                page_cands, stats = self._extract_page(
+                    page, bib_id_set=bib_id_set, global_base=global_base
+                )
+                cands.extend(page_cands)
+                self.page_stats.append(stats)
+
         # Debug output
         if self.config.debug:
             print("\n" + "=" * 60)
@@ -318,25 +199,267 @@ class SuperscriptChannel:
             print("=" * 60 + "\n")
         
         # Degrade mode: require min occurrences per id when no bib
-        if (not bib.is_valid()) and self.config.degrade_mode and self.config.degrade_min_count > 1:
-            counts = Counter()
-            for c in cands:
-                for rid in c.ref_ids:
-                    counts[rid] += 1
+        if (not bib.is_valid()) and self.config.degrade_mode and self.config.degrade_min_count > 1 and cands:
+            # Tally all ref ids in one bincount instead of a Counter walk;
+            # ids are small positive ints so the array stays tiny
+            ids = np.fromiter(
+                (rid for c in cands for rid in c.ref_ids), dtype=np.int64
+            )
+            keep = np.bincount(ids) >= self.config.degrade_min_count
             filtered: List[CitationCandidate] = []
             for c in cands:
-                keep_ids = [rid for rid in c.ref_ids if counts.get(rid, 0) >= self.config.degrade_min_count]
+                keep_ids = [rid for rid in c.ref_ids if keep[rid]]
                 if not keep_ids:
                     continue
                 c.ref_ids = keep_ids
                 filtered.append(c)
-            
+
             if self.config.debug:
                 print(f"[SUP] Degrade mode filtered: {len(cands)} -> {len(filtered)}")
             cands = filtered
         
         return cands
+
+    def _extract_page(
+        self,
+        page: PageData,
+        bib_id_set: Optional[Set[int]],
+        global_base: float,
+    ) -> Tuple[List[CitationCandidate], PageSupStats]:
+        """
+        Extract superscript candidates from a single page.
+
+        Pure given its arguments (page_stats come back in the return
+        value), so extract can run it serially or map it over a process
+        pool.
+        """
+        # Bind hot config scalars to locals: LOAD_FAST in the line/token
+        # loops instead of a double attribute lookup each time
+        cfg = self.config
+        zone_blocklist = cfg.zone_blocklist
+        title_block = cfg.first_page_title_block
+        title_cutoff = cfg.first_page_title_cutoff
+        rise_ratio = cfg.rise_ratio
+        size_ratio = cfg.size_ratio
+        max_digits = cfg.max_digits
+        min_id = cfg.min_id
+        max_id = cfg.max_id
+
+        cands: List[CitationCandidate] = []
+        stats = PageSupStats(page_num=page.page_num)
+        stats.lines_total = len(page.lines)
+
+        # Partial evaluation against the fixed config/page: the title
+        # filter can only fire on page 1, and its cutoff is constant, so
+        # both fold to per-page values instead of per-line branches
+        check_title = title_block and page.page_num == 1
+        title_cutoff_y = page.height * title_cutoff
+
+        for line in page.lines:
+            # Zone filter
+            if line.zone in zone_blocklist:
+                stats.lines_in_zone_blocklist += 1
+                continue
+
+            # First page title block filter
+            if (check_title and
+                line.zone == "title" and
+                line.center_y < title_cutoff_y):
+                stats.lines_in_zone_blocklist += 1
+                continue
+            
+            # Use global base size, but allow page/line to influence slightly
+            line_body_size = line.body_size or global_base
+            # Use minimum of global and line (more conservative baseline)
+            base_size = min(global_base, line_body_size) if line_body_size > 0 else global_base
+            
+            baseline_y = line.body_baseline
+            rise_thresh = rise_ratio * base_size
+            size_thresh = size_ratio * base_size
+            
+            # Candidate selection and token splitting fused into one
+            # vectorized pass over the per-line SoA columns
+            stats.chars_checked += len(line.chars)
+            tokens = self._line_tokens(
+                line, base_size, baseline_y, rise_thresh, size_thresh
+            )
+            if not tokens:
+                continue
+            stats.chars_candidate += sum(len(t) for t in tokens)
+            stats.tokens_formed += len(tokens)
+            
+            for tok in tokens:
+                # List comp feeds join's fast path (no generator protocol)
+                raw = "".join([c.text for c in tok])
+                
+                # Raw filters
+                if "." in raw:
+                    stats.tokens_rejected_dot += 1
+                    continue
+                
+                # Memoized: raw tokens like "1" repeat across pages
+                norm, ids = normalize_and_parse(raw, max_span=20)
+
+                # Digit-only constraints
+                digits_only = norm.isdigit()
+                if digits_only:
+                    if len(norm) > max_digits:
+                        stats.tokens_rejected_too_long += 1
+                        continue
+                    if len(norm) > 1 and norm.startswith("0"):
+                        stats.tokens_rejected_leading_zero += 1
+                        continue
+                    if norm == "0":
+                        stats.tokens_rejected_zero += 1
+                        continue
+
+                if not ids:
+                    stats.tokens_rejected_no_ids += 1
+                    continue
+
+                # ID range filter (copies out of the cached tuple)
+                ref_ids = [r for r in ids if min_id <= r <= max_id]
+                if not ref_ids:
+                    stats.tokens_rejected_id_range += 1
+                    continue
+                
+                # Bib constraint (if enabled and bib is valid and large enough)
+                if bib_id_set is not None:
+                    filtered_ids = [r for r in ref_ids if r in bib_id_set]
+                    if not filtered_ids:
+                        stats.tokens_rejected_bib += 1
+                        continue
+                    ref_ids = filtered_ids
+                
+                # Build candidate: accumulate all four bbox extremes and
+                # the size sum in one pass instead of five scans of tok
+                first = tok[0]
+                x0, top = first.x0, first.top
+                x1, bottom = first.x1, first.bottom
+                size_sum = first.size
+                for c in tok[1:]:
+                    if c.x0 < x0: x0 = c.x0
+                    if c.top < top: top = c.top
+                    if c.x1 > x1: x1 = c.x1
+                    if c.bottom > bottom: bottom = c.bottom
+                    size_sum += c.size
+                bbox = (x0, top, x1, bottom)
+                anchor_left = page.get_left_context(line.line_id, x0, max_chars=32)
+                
+                tok_mid_y = (top + bottom) / 2.0
+                rise = (baseline_y - tok_mid_y) / (base_size or 1.0)
+                
+                occ = Occurrence(
+                    page=page.page_num,
+                    bbox=bbox,
+                    line_id=line.line_id,
+                    source=_SRC_SUPERSCRIPT,
+                    anchor_left=anchor_left,
+                )
+                cand = CitationCandidate(
+                    ref_ids=ref_ids,
+                    occurrence=occ,
+                    evidence=SupEvidence(
+                        pattern="superscript",
+                        raw=raw,
+                        zone=line.zone,
+                        rise=rise,
+                        base_size=base_size,
+                        tok_size=size_sum / len(tok),
+                    ),
+                    confidence=self.config.base_confidence,
+                )
+                cands.append(cand)
+                stats.candidates_accepted += 1
+                
+                # Sample for debug
+                if len(stats.sample_candidates) < 5:
+                    stats.sample_candidates.append({
+                        "raw": raw,
+                        "ref_ids": ref_ids,
+                        "rise": round(rise, 3),
+                        "anchor": anchor_left[:20] if anchor_left else "",
+                    })
+
+        return cands, stats
     
+    def _line_tokens(
+        self,
+        line,
+        base_size: float,
+        baseline_y: float,
+        rise_thresh: float,
+        size_thresh: float,
+    ) -> List[List[Any]]:
+        """
+        Select superscript candidate chars for one line and split them
+        into x-adjacent tokens, in one fused pass.
+
+        The classic (small + raised) and right-attach geometric tests run
+        as numpy comparisons over per-line SoA columns instead of a
+        per-char Python loop; only the digit-like text check stays in
+        Python. Right-attach compares each char against its predecessor
+        via shifted slices, mirroring the old prev_char walk. Token break
+        points then come from a gap comparison over the same x columns,
+        so the candidate list is never materialized separately.
+        """
+        chars = line.chars
+        n = len(chars)
+        if n == 0:
+            return []
+
+        # The mask is classified once per line at page level and cached,
+        # so re-running this channel (or any other) pays nothing; most
+        # text lines have no digit-like char and bail out here.
+        digit_like = line.digit_like_mask
+        if not digit_like.any():
+            return []
+
+        # Cached per-line SoA columns, shared with the page-model extent
+        # and baseline reductions
+        size = line.size_arr
+        x0 = line.x0_arr
+        x1 = line.x1_arr
+        mid_y = line.mid_y_arr
+
+        # Method 1: classic superscript (small AND raised)
+        classic = (size <= size_thresh) & (mid_y < baseline_y - rise_thresh)
+
+        # Method 2: right-attach (near-body-size but raised relative to
+        # the previous char and close on its right)
+        mask = classic
+        if self.config.right_attach_enabled and n > 1:
+            gap = x0[1:] - x1[:-1]
+            attach = np.zeros(n, dtype=bool)
+            attach[1:] = (
+                (gap >= -1.0) &
+                (gap <= base_size * self.config.right_attach_gap_max_ratio) &
+                (size[1:] <= size[:-1] * self.config.right_attach_size_ratio) &
+                (mid_y[1:] < mid_y[:-1] - base_size * self.config.right_attach_rise_ratio)
+            )
+            mask = classic | attach
+
+        sel = np.nonzero(digit_like & mask)[0]
+        if not len(sel):
+            return []
+
+        # Token split on the already-built x columns. Lines are x-sorted
+        # at build time, so selected chars are left-to-right; argsort runs
+        # only if that monotonicity is broken.
+        x0_sel = x0[sel]
+        if len(sel) > 1 and (np.diff(x0_sel) < 0).any():
+            order = np.argsort(x0_sel, kind='stable')
+            sel = sel[order]
+            x0_sel = x0[sel]
+        sup_chars = [chars[i] for i in sel]
+        if len(sel) == 1:
+            return [sup_chars]
+
+        gaps = np.maximum(0.0, x0_sel[1:] - x1[sel][:-1])
+        breaks = np.nonzero(gaps > self.config.adjacent_gap_ratio * base_size)[0] + 1
+        bounds = [0, *breaks.tolist(), len(sup_chars)]
+        return [sup_chars[a:b] for a, b in zip(bounds, bounds[1:])]
+
     def get_page_stats(self) -> List[PageSupStats]:
         """Get per-page statistics from last extraction"""
         return self.page_stats
@@ -6,13 +6,18 @@ applies bib constraints, and produces final RefEntry list.
 """
 
 from dataclasses import dataclass, field
+from itertools import groupby
+from operator import itemgetter
 from typing import List, Dict, Set, Optional
-from collections import defaultdict
 
 from ..types import (
     Occurrence, CitationCandidate, RefEntry, Bibliography
 )
 
+# Channel names interned to small ints for the packed dedup key;
+# unknown sources get an id appended on first sight
+_SOURCE_IDS = {"bracket": 0, "superscript": 1}
+
 
 @dataclass
 class FusionConfig:
@@ -48,6 +53,7 @@ class CitationFuser:
     
     def __init__(self, config: Optional[FusionConfig] = None):
         self.config = config or FusionConfig()
+        self._has_unlinked = False  # set by _create_entry, reset per fuse
     
     def fuse(
         self,
@@ -64,12 +70,17 @@ class CitationFuser:
         Returns:
             List of RefEntry sorted by ref_id
         """
-        # 1. Group by ref_id
-        groups: Dict[int, List[CitationCandidate]] = defaultdict(list)
-        
-        for cand in candidates:
-            for ref_id in cand.ref_ids:
-                groups[ref_id].append(cand)
+        self._has_unlinked = False
+
+        # 1. Group by ref_id: sort flattened (rid, cand) pairs and slice
+        # runs with groupby — the stable sort keeps candidate order within
+        # each group, which the dense-duplicate filter relies on
+        pairs = [(rid, cand) for cand in candidates for rid in cand.ref_ids]
+        pairs.sort(key=itemgetter(0))
+        groups: Dict[int, List[CitationCandidate]] = {
+            rid: [c for _, c in grp]
+            for rid, grp in groupby(pairs, key=itemgetter(0))
+        }
         
         # 1.5. Filter dense duplicates (page headers, figure numbers)
         groups = self._filter_dense_duplicates(groups)
@@ -101,22 +112,26 @@ class CitationFuser:
     ) -> Optional[RefEntry]:
         """Create RefEntry from candidates for a single ref_id"""
         entry = RefEntry(ref_id=ref_id)
-        
-        seen_keys: Set[tuple] = set()
+
+        seen_keys: Set[int] = set()
         max_confidence = 0.0
         sources: Set[str] = set()
-        
+        r = self.config.dedup_center_round if self.config.dedup_center_round > 0 else 1.0
+
         for cand in cands:
             occ = cand.occurrence
-            
-            # Deduplicate by location key
+
+            # Deduplicate by location: page/line, the quantized bbox
+            # center and the source id all packed into one int, so the
+            # set hashes a single integer instead of a mixed tuple
             cx = (occ.bbox[0] + occ.bbox[2]) / 2.0
             cy = (occ.bbox[1] + occ.bbox[3]) / 2.0
-            r = self.config.dedup_center_round if self.config.dedup_center_round > 0 else 1.0
-            rcx = round(cx / r) * r
-            rcy = round(cy / r) * r
-            dedup_key = (occ.page, occ.line_id, rcx, rcy, occ.source)
-            
+            qx = int(round(cx / r))
+            qy = int(round(cy / r))
+            src_id = _SOURCE_IDS.setdefault(occ.source, len(_SOURCE_IDS))
+            dedup_key = (((occ.page * 100003 + occ.line_id) * 1000003 + qx)
+                         * 1000003 + qy) * 8 + src_id
+
             if dedup_key not in seen_keys:
                 seen_keys.add(dedup_key)
                 entry.add_occurrence(occ)
@@ -135,12 +150,13 @@ class CitationFuser:
         entry.confidence = min(max_confidence, 1.0)
         entry.sources = sources
         
-        # Link bib detail
-        if bib.has_id(ref_id):
-            entry.bib_detail = bib.get_detail(ref_id)
+        # Link bib detail (direct set/dict access, no method dispatch)
+        if ref_id in bib.bib_ids:
+            entry.bib_detail = bib.bib_map.get(ref_id)
             entry.unlinked_to_bib = False
         else:
             entry.unlinked_to_bib = True
+            self._has_unlinked = True
         
         return entry if entry.occurrences else None
     
@@ -191,6 +207,10 @@ class CitationFuser:
         - If bib has < bib_min_ids_for_hard_constraint entries:
           - No penalty applied (bib may be incomplete)
         """
+        # Clean documents have nothing to penalize; skip the pass entirely
+        if not self._has_unlinked:
+            return entries
+
         # Only apply soft constraint if bib is substantial
         if not bib.is_valid():
             return entries
@@ -217,27 +237,26 @@ class CitationFuser:
         
         Strategy: For each ref_id, if there are multiple candidates on
         the same (page, line_id), keep only the first one.
+
+        Mutates groups in place; the per-group dedup uses a plain set of
+        packed page/line ints rather than a dict of tuples.
         """
-        filtered_groups: Dict[int, List[CitationCandidate]] = {}
-        
         for ref_id, cands in groups.items():
-            # Track (page, line_id) -> first candidate
-            seen_lines: Dict[tuple, CitationCandidate] = {}
+            seen_lines: Set[int] = set()
             kept_cands = []
-            
+
             for cand in cands:
-                page_line_key = (cand.occurrence.page, cand.occurrence.line_id)
-                
+                page_line_key = cand.occurrence.page * 100003 + cand.occurrence.line_id
+
                 if page_line_key not in seen_lines:
                     # First occurrence on this line - keep it
-                    seen_lines[page_line_key] = cand
+                    seen_lines.add(page_line_key)
                     kept_cands.append(cand)
                 # else: duplicate on same line - skip it
-            
-            if kept_cands:
-                filtered_groups[ref_id] = kept_cands
-        
-        return filtered_groups
+
+            groups[ref_id] = kept_cands
+
+        return groups
 
 
 def fuse_candidates(
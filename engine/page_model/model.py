@@ -6,17 +6,50 @@ Used by all channels for consistent position analysis.
 """
 
 from dataclasses import dataclass, field
+from functools import cached_property
+from operator import itemgetter
 from typing import List, Dict, Any, Tuple, Optional, Iterable
-from collections import Counter
+import bisect
 import re
-import statistics
+import zlib
 
+import numpy as np
 
-@dataclass
+# Digit-like chars for citation detection: digits, list/range punctuation
+# and unicode superscript digits. Classified once per line at first use
+# and shared by every channel.
+_DIGIT_LIKE = frozenset("0123456789,-–¹²³⁴⁵⁶⁷⁸⁹⁰")
+_SUP_DIGITS = frozenset("¹²³⁴⁵⁶⁷⁸⁹⁰")
+
+# Compiled once: get_left_context runs for every citation bbox, and the
+# module-level pattern skips the re-cache lookup on each call
+_WS_RE = re.compile(r"\s+")
+
+
+def _mode_size(chars: List['CharData']) -> float:
+    """
+    Most common rounded char size in one counting pass — no
+    intermediate size list or Counter. Ties resolve to the first-seen
+    size, matching Counter.most_common (dicts keep insertion order and
+    max returns the first maximal item).
+    """
+    counts: Dict[float, int] = {}
+    for c in chars:
+        k = round(c.size, 2)
+        counts[k] = counts.get(k, 0) + 1
+    if not counts:
+        return 10.0
+    return max(counts.items(), key=itemgetter(1))[0]
+
+
+@dataclass(slots=True)
 class CharData:
     """
     Single character with all relevant properties.
     Normalized from pdfplumber char dict.
+
+    Slotted: one instance per char means millions of objects on large
+    PDFs, and dropping __dict__ roughly halves the per-char footprint.
     """
     text: str
     x0: float
@@ -25,12 +58,12 @@ class CharData:
     bottom: float
     size: float
     fontname: str = "Unknown"
-    
+
     @property
     def mid_y(self) -> float:
         """Vertical center of character"""
         return (self.top + self.bottom) / 2
-    
+
     @property
     def mid_x(self) -> float:
         """Horizontal center of character"""
@@ -64,62 +97,108 @@ class LineData:
     chars: List[CharData] = field(default_factory=list)
     zone: str = "body"  # title/body/footer
     
-    @property
+    @cached_property
     def text(self) -> str:
         """Concatenated text of all chars"""
-        return ''.join(c.text for c in self.chars)
+        return ''.join([c.text for c in self.chars])
     
+    # --- SoA columns ---
+    # Per-line contiguous float64 views over the char list, built once on
+    # first use. Reductions and the superscript geometry tests run on
+    # these instead of pulling attributes char-by-char; the CharData list
+    # stays the canonical storage for text-level consumers.
+
+    @cached_property
+    def x0_arr(self) -> np.ndarray:
+        """Per-char x0 column (cached)"""
+        return np.fromiter((c.x0 for c in self.chars), dtype=np.float64, count=len(self.chars))
+
+    @cached_property
+    def x1_arr(self) -> np.ndarray:
+        """Per-char x1 column (cached)"""
+        return np.fromiter((c.x1 for c in self.chars), dtype=np.float64, count=len(self.chars))
+
+    @cached_property
+    def top_arr(self) -> np.ndarray:
+        """Per-char top column (cached)"""
+        return np.fromiter((c.top for c in self.chars), dtype=np.float64, count=len(self.chars))
+
+    @cached_property
+    def bottom_arr(self) -> np.ndarray:
+        """Per-char bottom column (cached)"""
+        return np.fromiter((c.bottom for c in self.chars), dtype=np.float64, count=len(self.chars))
+
+    @cached_property
+    def size_arr(self) -> np.ndarray:
+        """Per-char size column (cached)"""
+        return np.fromiter((c.size for c in self.chars), dtype=np.float64, count=len(self.chars))
+
+    @cached_property
+    def mid_y_arr(self) -> np.ndarray:
+        """Per-char vertical center column (cached)"""
+        return (self.top_arr + self.bottom_arr) * 0.5
+
+    @cached_property
+    def _extent(self) -> Tuple[float, float, float, float]:
+        """All four bbox extremes as vector reductions on the columns"""
+        if not self.chars:
+            return (0, 0, 0, 0)
+        return (
+            float(self.x0_arr.min()), float(self.top_arr.min()),
+            float(self.x1_arr.max()), float(self.bottom_arr.max()),
+        )
+
     @property
     def top(self) -> float:
         """Top of line bounding box"""
-        if not self.chars:
-            return 0
-        return min(c.top for c in self.chars)
-    
+        return self._extent[1]
+
     @property
     def bottom(self) -> float:
         """Bottom of line bounding box"""
-        if not self.chars:
-            return 0
-        return max(c.bottom for c in self.chars)
-    
+        return self._extent[3]
+
+    @cached_property
+    def center_y(self) -> float:
+        """Vertical center of line bounding box (cached)"""
+        return (self.top + self.bottom) / 2
+
     @property
     def x0(self) -> float:
         """Left edge of line"""
-        if not self.chars:
-            return 0
-        return min(c.x0 for c in self.chars)
-    
+        return self._extent[0]
+
     @property
     def x1(self) -> float:
         """Right edge of line"""
-        if not self.chars:
-            return 0
-        return max(c.x1 for c in self.chars)
+        return self._extent[2]
     
     @property
     def bbox(self) -> Tuple[float, float, float, float]:
         """Bounding box of entire line"""
-        return (self.x0, self.top, self.x1, self.bottom)
+        return self._extent
     
-    @property
+    @cached_property
     def body_size(self) -> float:
         """Most common font size in line (body text size)"""
         if not self.chars:
             return 10.0
-        sizes = [round(c.size, 2) for c in self.chars]
-        return Counter(sizes).most_common(1)[0][0]
+        return _mode_size(self.chars)
     
-    @property
+    @cached_property
+    def _body_mask(self) -> np.ndarray:
+        """Boolean column of chars within 0.5pt of the body size"""
+        return np.abs(self.size_arr - self.body_size) < 0.5
+
+    @cached_property
     def body_baseline(self) -> float:
         """Average bottom of body-sized chars"""
         if not self.chars:
             return 0
-        body = self.body_size
-        base_chars = [c for c in self.chars if abs(c.size - body) < 0.5]
-        if not base_chars:
-            base_chars = self.chars
-        return sum(c.bottom for c in base_chars) / len(base_chars)
+        mask = self._body_mask
+        if not mask.any():
+            return float(self.bottom_arr.mean())
+        return float(self.bottom_arr[mask].mean())
 
     # Compatibility with spec naming
     @property
@@ -130,16 +209,45 @@ class LineData:
     def median_size(self) -> float:
         return self.body_size
     
-    @property
+    @cached_property
+    def digit_like_mask(self) -> np.ndarray:
+        """
+        Per-char boolean mask of digit-like text (cached).
+
+        Single-character text takes one frozenset lookup; multi-char
+        text falls back to isdigit / superscript-digit containment.
+        """
+        n = len(self.chars)
+        return np.fromiter(
+            ((c.text in _DIGIT_LIKE) if len(c.text) == 1
+             else bool(c.text) and c.text != "." and
+             (c.text.isdigit() or not _SUP_DIGITS.isdisjoint(c.text))
+             for c in self.chars),
+            dtype=bool, count=n,
+        )
+
+    @cached_property
+    def _cum_ends(self) -> List[int]:
+        """
+        Cumulative end offset of each char within text (cached).
+        Multi-char text counts at least 1, matching _slice_bbox_from_line.
+        """
+        ends: List[int] = []
+        pos = 0
+        for c in self.chars:
+            pos += max(1, len(c.text))
+            ends.append(pos)
+        return ends
+
+    @cached_property
     def body_mid_y(self) -> float:
         """Average mid_y of body-sized chars"""
         if not self.chars:
             return 0
-        body = self.body_size
-        base_chars = [c for c in self.chars if abs(c.size - body) < 0.5]
-        if not base_chars:
-            base_chars = self.chars
-        return sum(c.mid_y for c in base_chars) / len(base_chars)
+        mask = self._body_mask
+        if not mask.any():
+            return float(self.mid_y_arr.mean())
+        return float(self.mid_y_arr[mask].mean())
 
 
 @dataclass
@@ -152,22 +260,43 @@ class PageData:
     height: float
     lines: List[LineData] = field(default_factory=list)
     
-    @property
+    @cached_property
     def text(self) -> str:
         """Full page text with newlines"""
         return '\n'.join(line.text for line in self.lines)
     
-    @property
+    @cached_property
     def char_count(self) -> int:
-        """Total character count"""
+        """Total character count (cached)"""
         return sum(len(line.chars) for line in self.lines)
+
+    @cached_property
+    def content_hash(self) -> int:
+        """
+        Cheap content fingerprint (cached): adler32 of the page text
+        seeded with the page number. Used by the pipeline to skip
+        re-extraction on identical inputs.
+        """
+        return zlib.adler32(self.text.encode('utf-8'), self.page_num)
+
+    @cached_property
+    def _line_starts(self) -> List[int]:
+        """Start offset of each line within text (cached)"""
+        starts = [0] * len(self.lines)
+        offset = 0
+        for i, line in enumerate(self.lines):
+            starts[i] = offset
+            offset += len(line.text) + 1  # +1 for the joining newline
+        return starts
     
+    @cached_property
+    def _line_by_id(self) -> Dict[int, 'LineData']:
+        """line_id -> LineData index, built once on first lookup"""
+        return {line.line_id: line for line in self.lines}
+
     def get_line(self, line_id: int) -> Optional[LineData]:
-        """Get line by ID"""
-        for line in self.lines:
-            if line.line_id == line_id:
-                return line
-        return None
+        """Get line by ID (dict lookup, no linear scan)"""
+        return self._line_by_id.get(line_id)
     
     def iter_chars(self):
         """Iterate all chars with (line_id, char) pairs"""
@@ -175,6 +304,30 @@ class PageData:
             for char in line.chars:
                 yield line.line_id, char
 
+    @cached_property
+    def _char_columns(self) -> Dict[str, np.ndarray]:
+        """Concatenated per-line SoA columns plus a line_id column"""
+        lines = self.lines
+        return {
+            'line_id': np.repeat(
+                np.fromiter((ln.line_id for ln in lines), dtype=np.int64, count=len(lines)),
+                [len(ln.chars) for ln in lines],
+            ),
+            'x0': np.concatenate([ln.x0_arr for ln in lines]) if lines else np.empty(0),
+            'x1': np.concatenate([ln.x1_arr for ln in lines]) if lines else np.empty(0),
+            'top': np.concatenate([ln.top_arr for ln in lines]) if lines else np.empty(0),
+            'bottom': np.concatenate([ln.bottom_arr for ln in lines]) if lines else np.empty(0),
+            'size': np.concatenate([ln.size_arr for ln in lines]) if lines else np.empty(0),
+        }
+
+    def char_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Page-wide char columns for vectorized consumers: one contiguous
+        float64 array per geometric field plus an int64 line_id column,
+        built once — no per-char generator resumes.
+        """
+        return self._char_columns
+
     def get_left_context(self, line_id: int, x0: float, max_chars: int = 32) -> str:
         """
         Same-line left context for a bbox x0.
@@ -186,8 +339,8 @@ class PageData:
         left_chars = [c for c in line.chars if c.x1 <= x0]
         if not left_chars:
             return ""
-        s = "".join(c.text for c in left_chars[-max_chars:])
-        s = re.sub(r"\s+", " ", s).strip()
+        s = "".join([c.text for c in left_chars[-max_chars:]])
+        s = _WS_RE.sub(" ", s).strip()
         return s
 
     @dataclass
@@ -200,18 +353,34 @@ class PageData:
     def locate_text_matches(self, pattern: re.Pattern) -> List['PageData.TextMatch']:
         """
         Locate regex matches in line text and approximate bbox using char positions.
+        Callers must pass an already-compiled re.Pattern.
+
+        Runs one finditer over the cached page text and maps offsets back
+        to lines through a cached, bisected offset table, instead of
+        invoking the regex engine once per line. Repeated calls with
+        different patterns (one per channel) only pay the regex scan.
+        Matches spanning a line break are dropped, matching the old
+        per-line behavior.
         """
         matches: List[PageData.TextMatch] = []
-        for line in self.lines:
-            text = line.text
-            for m in pattern.finditer(text):
-                bbox = _slice_bbox_from_line(line, m.start(), m.end())
-                matches.append(PageData.TextMatch(
-                    page_num=self.page_num,
-                    bbox=bbox,
-                    line_id=line.line_id,
-                    match_text=m.group(0),
-                ))
+        if not self.lines:
+            return matches
+
+        line_starts = self._line_starts
+        for m in pattern.finditer(self.text):
+            idx = bisect.bisect_right(line_starts, m.start()) - 1
+            line = self.lines[idx]
+            local_start = m.start() - line_starts[idx]
+            local_end = m.end() - line_starts[idx]
+            if local_end > len(line.text):
+                continue  # crosses a line break
+            bbox = _slice_bbox_from_line(line, local_start, local_end)
+            matches.append(PageData.TextMatch(
+                page_num=self.page_num,
+                bbox=bbox,
+                line_id=line.line_id,
+                match_text=m.group(0),
+            ))
         return matches
 
 
@@ -223,25 +392,18 @@ def _slice_bbox_from_line(line: LineData, start: int, end: int) -> Tuple[float,
     if not line.chars or start >= end:
         return line.bbox
 
-    pos = 0
-    start_char: Optional[CharData] = None
-    end_char: Optional[CharData] = None
-
-    for ch in line.chars:
-        ch_len = max(1, len(ch.text))
-        next_pos = pos + ch_len
-        if start_char is None and start < next_pos:
-            start_char = ch
-        if end <= next_pos:
-            end_char = ch
-            break
-        pos = next_pos
-
-    if start_char and end_char:
-        return (start_char.x0, min(start_char.top, end_char.top), end_char.x1, max(start_char.bottom, end_char.bottom))
-    if start_char:
+    # Binary-search the cached cumulative offsets instead of walking the
+    # char list for every match on the line
+    ends = line._cum_ends
+    i = bisect.bisect_right(ends, start)  # first char ending past start
+    j = bisect.bisect_left(ends, end)     # first char covering end
+    if i >= len(ends):
+        return line.bbox
+    start_char = line.chars[i]
+    if j >= len(ends):
         return start_char.bbox
-    return line.bbox
+    end_char = line.chars[j]
+    return (start_char.x0, min(start_char.top, end_char.top), end_char.x1, max(start_char.bottom, end_char.bottom))
 
 
 def build_page_data(
@@ -269,72 +431,82 @@ def build_page_data(
     """
     if not page_chars:
         return PageData(page_num=page_num, width=page_width, height=page_height)
-    
-    # 1) Estimate page median font size -> dynamic line tolerance
-    sizes_all = [c.get('size', 0) for c in page_chars if c.get('size', 0) > 0]
-    median_size = statistics.median(sizes_all) if sizes_all else 10.0
+
+    # Vectorized grouping: the sequential rules only ever compare a char
+    # against its immediate predecessor in (mid_y, x0) order, so the whole
+    # pass collapses into shifted-slice comparisons on SoA float arrays.
+    n = len(page_chars)
+    x0 = np.fromiter((c.get('x0', 0) for c in page_chars), dtype=np.float64, count=n)
+    x1 = np.fromiter((c.get('x1', 0) for c in page_chars), dtype=np.float64, count=n)
+    top = np.fromiter((c.get('top', 0) for c in page_chars), dtype=np.float64, count=n)
+    bottom = np.fromiter((c.get('bottom', 0) for c in page_chars), dtype=np.float64, count=n)
+    size = np.fromiter((c.get('size', 0) for c in page_chars), dtype=np.float64, count=n)
+    mid_y = (top + bottom) * 0.5
+
+    # 1) Page median font size -> dynamic line tolerance
+    positive_sizes = size[size > 0]
+    median_size = float(np.median(positive_sizes)) if positive_sizes.size else 10.0
     line_tol = max(3.0, median_size * 0.35)   # 10pt -> ~3.5px, 12pt -> ~4.2px
     attach_tol = max(6.0, median_size * 0.70)  # wider tolerance for superscript attachment
-    
-    def mid_y(ch):
-        return (ch.get('top', 0) + ch.get('bottom', 0)) / 2
-    
-    # Sort by mid_y then x0 (better for mixed superscript lines)
-    sorted_chars = sorted(page_chars, key=lambda c: (mid_y(c), c.get('x0', 0)))
-    
-    # Group into lines with superscript attachment
-    raw_lines: List[List[Dict[str, Any]]] = []
-    if sorted_chars:
-        current_line = [sorted_chars[0]]
-        for c in sorted_chars[1:]:
-            prev = current_line[-1]
-            dy = abs(mid_y(c) - mid_y(prev))
-            
-            # Rule A: normal character clustering with dynamic tolerance
-            if dy <= line_tol:
-                current_line.append(c)
-                continue
-            
-            # Rule B: superscript "attach back to parent line"
-            # Conditions: smaller font, near right side of prev char, vertical offset not extreme
-            c_size = c.get('size', 0) or median_size
-            p_size = prev.get('size', 0) or median_size
-            gap = c.get('x0', 0) - prev.get('x1', 0)
-            
-            looks_like_sup_attach = (
-                c_size <= p_size * 0.95 and
-                -1.0 <= gap <= (median_size * 0.8) and
-                dy <= attach_tol
-            )
-            if looks_like_sup_attach:
-                current_line.append(c)
-                continue
-            
-            # Start new line
-            raw_lines.append(sorted(current_line, key=lambda x: x.get('x0', 0)))
-            current_line = [c]
-        
-        raw_lines.append(sorted(current_line, key=lambda x: x.get('x0', 0)))
-    
-    # Convert raw lines to LineData
-    lines: List[LineData] = []
-    for raw_line in raw_lines:
-        char_data_list = [CharData.from_pdfplumber(c) for c in raw_line]
-        lines.append(LineData(
-            line_id=len(lines),
-            chars=char_data_list
-        ))
+
+    # 2) Sort by mid_y then x0 (better for mixed superscript lines)
+    order = np.lexsort((x0, mid_y))
+    x0_s, x1_s, size_s, mid_y_s = x0[order], x1[order], size[order], mid_y[order]
+    size_s = np.where(size_s > 0, size_s, median_size)  # missing sizes fall back to median
+
+    # 3) Consecutive-pair rules.
+    # Rule A: normal clustering within dynamic tolerance.
+    # Rule B: superscript "attach back to parent line" — smaller font,
+    # near the right side of the previous char, vertical offset not extreme.
+    dy = np.abs(np.diff(mid_y_s))
+    gap = x0_s[1:] - x1_s[:-1]
+    attach = (
+        (size_s[1:] <= size_s[:-1] * 0.95)
+        & (gap >= -1.0) & (gap <= median_size * 0.8)
+        & (dy <= attach_tol)
+    )
+    new_line = (dy > line_tol) & ~attach
+    line_ids = np.zeros(n, dtype=np.int64)
+    np.cumsum(new_line, out=line_ids[1:])
+
+    # 4) Stable re-sort within each line by x0 (a line can mix clusters,
+    # so x0 is not monotone after the attach rule), then cut at breaks
+    within = np.lexsort((x0_s, line_ids))
+    final_idx = order[within]
+    breaks = np.nonzero(np.diff(line_ids[within]))[0] + 1
+    bounds = [0, *breaks.tolist(), n]
+
+    # Bulk positional construction from the SoA columns: .tolist() gives
+    # plain Python floats and skips from_pdfplumber's seven dict.get calls
+    x0_l, top_l, x1_l, bottom_l, size_l = (
+        x0.tolist(), top.tolist(), x1.tolist(), bottom.tolist(), size.tolist()
+    )
+    texts = [c.get('text', '') for c in page_chars]
+    fonts = [c.get('fontname', 'Unknown') for c in page_chars]
+    char_data = [
+        CharData(texts[i], x0_l[i], top_l[i], x1_l[i], bottom_l[i], size_l[i], fonts[i])
+        for i in final_idx
+    ]
+    lines: List[LineData] = [
+        LineData(line_id=li, chars=char_data[bounds[li]:bounds[li + 1]])
+        for li in range(len(bounds) - 1)
+    ]
 
     # Assign zones (title/body/footer) by vertical proportion
-    # title: top 15%, footer: bottom 15%
-    for ln in lines:
-        mid_y = (ln.top + ln.bottom) / 2 if ln.chars else 0.0
-        if page_height > 0 and mid_y < page_height * 0.15:
-            ln.zone = "title"
-        elif page_height > 0 and mid_y > page_height * 0.85:
-            ln.zone = "footer"
-        else:
-            ln.zone = "body"
+    # title: top 15%, footer: bottom 15%. Line mid_ys come straight from
+    # the page-level columns via reduceat over the line bounds, so no
+    # per-line extent caches are forced this early. Skipped when the
+    # page height is unknown (zone default is already "body").
+    if page_height > 0:
+        starts = bounds[:-1]
+        top_f, bottom_f = top[final_idx], bottom[final_idx]
+        mid_ys = (np.minimum.reduceat(top_f, starts)
+                  + np.maximum.reduceat(bottom_f, starts)) * 0.5
+        zones = np.where(mid_ys < page_height * 0.15, 0,
+                         np.where(mid_ys > page_height * 0.85, 2, 1))
+        zone_names = ("title", "body", "footer")
+        for ln, z in zip(lines, zones.tolist()):
+            ln.zone = zone_names[z]
 
     return PageData(
         page_num=page_num,
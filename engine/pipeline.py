@@ -5,9 +5,12 @@ Single entry point for running the complete citation detection pipeline.
 Orchestrates: PageModel -> BibExtraction -> Channels -> Fusion -> RefEntry
 """
 
+import heapq
 from dataclasses import dataclass, field
+from operator import itemgetter
 from typing import List, Tuple, Dict, Any, Optional, Set
-from collections import Counter
+
+import numpy as np
 
 from .types import (
     CitationCandidate, RefEntry
@@ -94,7 +97,10 @@ class DebugBundle:
             "",
             "Reject Reasons:",
         ]
-        for reason, count in sorted(self.reject_reasons.items(), key=lambda x: -x[1])[:10]:
+        # Top-10 selection, no full sort of the reason dict
+        for reason, count in heapq.nlargest(
+            10, self.reject_reasons.items(), key=itemgetter(1)
+        ):
             lines.append(f"  {reason}: {count}")
         
         if self.sup_per_page_stats:
@@ -116,19 +122,25 @@ def estimate_global_body_size(all_chars: List[Dict[str, Any]]) -> float:
     2. Filter out extremes (< 5pt or > 20pt)
     3. Use mode (most common) as body size
     """
-    sizes = []
-    for c in all_chars:
-        s = c.get('size', 0)
-        if 5.0 <= s <= 20.0:  # Reasonable body text range
-            sizes.append(round(s, 1))  # Round for mode calculation
-    
-    if not sizes:
+    # Vectorized: one float32 column, range mask, then a bincount mode
+    # over sizes rounded to 0.1pt (index = size * 10)
+    n = len(all_chars)
+    sizes = np.fromiter(
+        (c.get('size', 0.0) for c in all_chars), dtype=np.float32, count=n
+    )
+    sizes = sizes[(sizes >= 5.0) & (sizes <= 20.0)]  # Reasonable body text range
+    if not sizes.size:
         return 10.0
-    
-    # Use mode (most common size)
-    counter = Counter(sizes)
-    mode_size = counter.most_common(1)[0][0]
-    return mode_size
+    rounded = np.round(sizes * 10).astype(np.int32)
+    counts = np.bincount(rounded)
+    ties = np.nonzero(counts == counts.max())[0]
+    if len(ties) > 1:
+        # Resolve equal counts to the first-seen size, matching the old
+        # Counter.most_common behavior (argmax: first occurrence index)
+        bucket = min(ties, key=lambda b: int(np.argmax(rounded == b)))
+    else:
+        bucket = ties[0]
+    return float(bucket) / 10.0
 
 
 class CitationPipeline:
@@ -140,15 +152,32 @@ class CitationPipeline:
         entries, debug = pipeline.run_from_pages(page_models, pages_text)
     """
     
+    # Channel results cached per input fingerprint (UI re-renders pass
+    # the same page models repeatedly)
+    _EXTRACT_CACHE_SIZE = 4
+
     def __init__(self, config: Optional[PipelineConfig] = None):
         self.config = config or PipelineConfig.phase1()
-        
+
         # Initialize components
         self.bib_extractor = BibliographyExtractor()
         self.bracket_channel = BracketChannel(self.config.bracket_config)
         self.sup_channel = SuperscriptChannel(self.config.sup_config)
         self.fuser = CitationFuser(self.config.fusion_config)
-    
+
+        # key -> channel output; see run_from_pages for key layout
+        self._extract_cache: Dict[Tuple, Any] = {}
+
+    def clear_cache(self):
+        """Drop cached channel extraction results"""
+        self._extract_cache.clear()
+
+    def _cache_put(self, key: Tuple, value: Any):
+        """Insert with FIFO eviction (dicts keep insertion order)"""
+        if len(self._extract_cache) >= self._EXTRACT_CACHE_SIZE:
+            self._extract_cache.pop(next(iter(self._extract_cache)))
+        self._extract_cache[key] = value
+
     def run_from_pages(
         self,
         page_models: List[PageData],
@@ -181,7 +210,7 @@ class CitationPipeline:
         
         debug.bib_ids_count = len(bib.bib_ids)
         debug.bib_map_count = len(bib.bib_map)
-        debug.bib_ids_sample = sorted(list(bib.bib_ids))[:20]
+        debug.bib_ids_sample = heapq.nsmallest(20, bib.bib_ids)
         
         # Determine if bib hard constraint will be used
         debug.bib_hard_constraint_used = (
@@ -195,31 +224,48 @@ class CitationPipeline:
             print(f"[PIPELINE] Bib hard constraint: {debug.bib_hard_constraint_used}")
         
         # 2. Run channels
+        # Same pages -> same channel output (bib and degrade mode derive
+        # from the pages too), so identical re-runs hit the cache
         candidates: List[CitationCandidate] = []
-        
+        page_key = tuple(p.content_hash for p in page_models)
+
         # Bracket channel (Phase 1)
         if self.config.enable_bracket:
-            bracket_cands = self.bracket_channel.extract(page_models, bib)
+            cache_key = ("bracket", page_key)
+            bracket_cands = self._extract_cache.get(cache_key)
+            if bracket_cands is None:
+                bracket_cands = self.bracket_channel.extract(page_models, bib)
+                self._cache_put(cache_key, bracket_cands)
             candidates.extend(bracket_cands)
             debug.bracket_candidates_count = len(bracket_cands)
-            
+
             if self.config.debug:
                 print(f"[PIPELINE] Bracket candidates: {len(bracket_cands)}")
-        
+
         # Superscript channel (Phase 2)
         if self.config.enable_superscript:
             # When bibliography is empty, enable degrade mode for superscript channel
             self.sup_channel.config.degrade_mode = (not bib.is_valid())
-            sup_cands = self.sup_channel.extract(page_models, bib)
+            # global_body_size is caller input, so it joins the key;
+            # per-page stats are cached with the candidates to keep
+            # get_page_stats consistent on a hit
+            cache_key = ("superscript", page_key,
+                         self.sup_channel.config.global_body_size)
+            cached = self._extract_cache.get(cache_key)
+            if cached is None:
+                sup_cands = self.sup_channel.extract(page_models, bib)
+                self._cache_put(cache_key, (sup_cands, self.sup_channel.page_stats))
+            else:
+                sup_cands, self.sup_channel.page_stats = cached
             candidates.extend(sup_cands)
             debug.superscript_candidates_count = len(sup_cands)
-            
+
             # Collect per-page stats
             for stat in self.sup_channel.get_page_stats():
                 debug.sup_per_page_stats.append(stat.summary())
                 if stat.candidates_accepted > 0:
                     debug.pages_with_sup_candidates.append(stat.page_num)
-            
+
             if self.config.debug:
                 print(f"[PIPELINE] Superscript candidates: {len(sup_cands)}")
                 print(f"[PIPELINE] Pages with sup candidates: {debug.pages_with_sup_candidates}")
@@ -252,38 +298,40 @@ def run_citation_pipeline(
     """
     Spec-friendly single entry point for running the pipeline on a PDF path.
     """
+    import itertools
+
     import pdfplumber
     from .page_model import build_page_data
 
     cfg = config or PipelineConfig.phase1()
     page_models: List[PageData] = []
     pages_text: List[str] = []
-    all_chars: List[Dict[str, Any]] = []
 
-    # First pass: collect all chars for global body size estimation
+    # Single pass: parsing each page is the dominant wall-clock cost, so
+    # hold the per-page chars instead of re-opening the PDF for the
+    # global body size estimate
+    per_page: List[Tuple[float, float, List[Dict[str, Any]]]] = []
     with pdfplumber.open(pdf_path) as pdf:
         for page in pdf.pages:
-            if page.chars:
-                all_chars.extend(page.chars)
-    
+            per_page.append((page.width or 612.0, page.height or 792.0, page.chars or []))
+
     # Estimate global body size
+    all_chars = list(itertools.chain.from_iterable(cs for _, _, cs in per_page))
     global_body_size = estimate_global_body_size(all_chars)
-    
+
     if cfg.debug:
         print(f"[PIPELINE] Estimated global body size: {global_body_size:.2f}")
-    
-    # Second pass: build page models
-    with pdfplumber.open(pdf_path) as pdf:
-        for i, page in enumerate(pdf.pages):
-            page_num = i + 1
-            page_data = build_page_data(
-                page.chars,
-                page_num=page_num,
-                page_width=page.width or 612.0,
-                page_height=page.height or 792.0,
-            )
-            page_models.append(page_data)
-            pages_text.append(page_data.text)
+
+    # Build page models from the already-held char lists
+    for i, (width, height, chars) in enumerate(per_page):
+        page_data = build_page_data(
+            chars,
+            page_num=i + 1,
+            page_width=width,
+            page_height=height,
+        )
+        page_models.append(page_data)
+        pages_text.append(page_data.text)
 
     pipeline = CitationPipeline(cfg)
     return pipeline.run_from_pages(page_models, pages_text, global_body_size)
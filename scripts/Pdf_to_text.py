@@ -254,6 +254,22 @@ class AcademicPDFRecognizer:
         self.is_color_rich = False
         self.superscripts = []  # Raw superscript tokens (geometric detection)
         # Citation analysis is handled by the new engine pipeline (`engine/`).
+        # The pipeline instance persists across runs so its per-page
+        # extraction cache can hit on identical re-analyses.
+        self._engine_pipeline: Optional[CitationPipeline] = None
+        self._engine_pipeline_phase2 = None  # enable_superscript it was built for
+
+    @property
+    def extracted_text(self) -> str:
+        return self._extracted_text
+
+    @extracted_text.setter
+    def extracted_text(self, value: str):
+        self._extracted_text = value
+        # Length and line count cached at assignment so consumers (e.g. the
+        # debug report) never rescan the whole buffer
+        self.extracted_text_len = len(value)
+        self.extracted_text_nlines = value.count('\n')
     
     def iter_extract_text_with_fonts(self):
         """
@@ -342,7 +358,11 @@ class AcademicPDFRecognizer:
                     text_parts.append(curr.get('text', ''))
             
             text_str = "".join(text_parts)
-            
+            # Strip carriage returns at the source so consumers never need a
+            # per-span cleanup pass
+            if '\r' in text_str:
+                text_str = text_str.replace('\r', '')
+
             if not text_str: # emptiness check
                 buffer = []
                 # Don't reset current font info yet, keeps continuity
@@ -599,18 +619,23 @@ class AcademicPDFRecognizer:
             print(f"[ENGINE] channels.superscript: {sup_module.__file__}")
             print(f"[ENGINE] pipeline: {pipe_module.__file__}")
         
-        # Configure pipeline
-        if enable_superscript:
-            config = PipelineConfig.phase2()
-        else:
-            config = PipelineConfig.phase1()
-        config.debug = debug
-        
         # Build page models and calculate global body size
         page_models, pages_text, global_body_size = self._build_engine_page_models(debug=debug)
-        
-        # Create pipeline and run
-        pipeline = CitationPipeline(config)
+
+        # Reuse the pipeline across runs (its extraction cache is keyed
+        # by page content hashes); rebuild only when the channel set
+        # changes, since channels are constructed from the config
+        pipeline = self._engine_pipeline
+        if pipeline is None or self._engine_pipeline_phase2 != enable_superscript:
+            if enable_superscript:
+                config = PipelineConfig.phase2()
+            else:
+                config = PipelineConfig.phase1()
+            pipeline = CitationPipeline(config)
+            self._engine_pipeline = pipeline
+            self._engine_pipeline_phase2 = enable_superscript
+        pipeline.config.debug = debug
+
         entries, debug_bundle = pipeline.run_from_pages(page_models, pages_text, global_body_size)
         
         # Store for GUI access